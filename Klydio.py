@@ -1,12 +1,674 @@
 import sys
 import os
+import re
+import gc
+import ast
+import json
+import base64
+import time
+import hashlib
+import math
+import mmap
+import struct
+import queue
+import bisect
+import signal
+import socket
+import tracemalloc
+import asyncio
+import tempfile
+import threading
+import mimetypes
+import subprocess
+import urllib.parse
+from array import array
+from collections import deque
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QStackedLayout, QSpacerItem, QSizePolicy,
+    QWidget, QVBoxLayout, QHBoxLayout, QStackedLayout, QGridLayout, QSpacerItem, QSizePolicy,
     QLabel, QPushButton, QSlider, QComboBox, QCheckBox, QFileDialog, QFrame,
-    QGroupBox,QGraphicsDropShadowEffect,QApplication,QToolButton,QGraphicsOpacityEffect
+    QGroupBox,QGraphicsDropShadowEffect,QApplication,QToolButton,QGraphicsOpacityEffect,QShortcut,
+    QLineEdit,QListWidget,QListWidgetItem,QStyle,QStyleOptionSlider,QProgressBar
 )
-from PyQt5.QtGui import QIcon, QPixmap, QFont,QTransform,QColor
-from PyQt5.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve,pyqtProperty,QTimer,QEvent,pyqtSignal
+from PyQt5.QtGui import QIcon, QPixmap, QFont,QTransform,QColor,QKeySequence,QPainter,QPen,QImage
+from PyQt5.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve,pyqtProperty,QTimer,QEvent,pyqtSignal,QObject,QProcess,QThread,QBuffer,QIODevice
+
+
+# --- Latency tracing (opt-in, KLYDIO_TRACE=1) ---
+# Spans and event-loop lag are kept in a ring buffer and written out in the
+# Chrome trace-event format (load in chrome://tracing or ui.perfetto.dev).
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _TraceSpan:
+    __slots__ = ("monitor", "name", "cat", "start")
+
+    def __init__(self, monitor, name, cat):
+        self.monitor = monitor
+        self.name = name
+        self.cat = cat
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.monitor.complete(self.name, self.cat, self.start)
+        return False
+
+
+class LatencyMonitor:
+    def __init__(self, enabled=False, interval_ms=20, threshold_ms=100, capacity=50000, dump_dir="."):
+        self.enabled = enabled
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self.dump_dir = dump_dir
+        self.dump_cooldown = 30.0
+        self.events = deque(maxlen=capacity)
+        self.pid = os.getpid()
+        self._timer = None
+        self._last_beat = 0
+        self._last_dump = 0.0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=os.environ.get("KLYDIO_TRACE", "0") not in ("", "0"),
+            threshold_ms=float(os.environ.get("KLYDIO_TRACE_THRESHOLD_MS", 100)),
+            dump_dir=os.environ.get("KLYDIO_TRACE_DIR", "."),
+        )
+
+    def now(self):
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def span(self, name, cat="ui"):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _TraceSpan(self, name, cat)
+
+    def complete(self, name, cat, start_ns):
+        # Records a span that started at start_ns (from now()) and ends now.
+        # Safe to call from mpv's event thread; deque.append is atomic.
+        if not self.enabled or not start_ns:
+            return
+        end = time.perf_counter_ns()
+        self.events.append(("X", name, cat, start_ns, end - start_ns, threading.get_ident(), None))
+
+    def instant(self, name, cat="ui", **args):
+        if not self.enabled:
+            return
+        self.events.append(("i", name, cat, time.perf_counter_ns(), 0, threading.get_ident(), args or None))
+
+    def start(self):
+        if not self.enabled or self._timer is not None:
+            return
+        self._timer = QTimer()
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.setInterval(self.interval_ms)
+        self._timer.timeout.connect(self._heartbeat)
+        self._last_beat = time.perf_counter_ns()
+        self._timer.start()
+        # The heartbeat keeps the interpreter ticking, so SIGUSR1 is handled promptly
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda *_: self.dump())
+
+    def stop(self):
+        if self._timer is None:
+            return
+        self._timer.stop()
+        self._timer = None
+        self.dump(background=False)
+
+    def _heartbeat(self):
+        now = time.perf_counter_ns()
+        lag_ms = max(0.0, (now - self._last_beat) / 1e6 - self.interval_ms)
+        self._last_beat = now
+        self.events.append(("C", "event-loop lag", "heartbeat", now, 0, threading.get_ident(), {"lag_ms": round(lag_ms, 3)}))
+
+        if lag_ms >= self.threshold_ms:
+            self.instant("lag spike", "heartbeat", lag_ms=round(lag_ms, 3))
+            if time.monotonic() - self._last_dump >= self.dump_cooldown:
+                self.dump()
+
+    def to_chrome_trace(self, events):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        trace = []
+        for tid in {e[5] for e in events}:
+            trace.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid,
+                          "args": {"name": names.get(tid, f"thread-{tid}")}})
+
+        for ph, name, cat, ts, dur, tid, args in events:
+            event = {"name": name, "cat": cat, "ph": ph, "ts": ts / 1000.0, "pid": self.pid, "tid": tid}
+            if ph == "X":
+                event["dur"] = dur / 1000.0
+            elif ph == "i":
+                event["s"] = "t"
+            if args:
+                event["args"] = args
+            trace.append(event)
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def dump(self, path=None, background=True):
+        if not self.enabled:
+            return None
+        self._last_dump = time.monotonic()
+        if path is None:
+            path = os.path.join(self.dump_dir, time.strftime("klydio-trace-%Y%m%d-%H%M%S.json"))
+        events = list(self.events)
+
+        # Serialise off the GUI thread so a dump never becomes a hitch of its own
+        def write():
+            with open(path, "w") as f:
+                json.dump(self.to_chrome_trace(events), f)
+            print(f"Trace written: {path}")
+
+        if background:
+            threading.Thread(target=write, name="trace-dump", daemon=True).start()
+        else:
+            write()
+        return path
+
+
+TRACE = LatencyMonitor.from_env()
+
+
+# --- Memory accounting (opt-in, KLYDIO_MEMTRACE=1) ---
+# Periodic samples of RSS, Python allocations grouped by the Klydio class that made
+# them (tracemalloc), live Qt wrappers by type and a few gauges such as mpv's demuxer
+# cache. Each sample is appended to a JSON-lines log with deltas against the first,
+# so a leak shows up as one group that keeps climbing.
+
+QT_COUNTED_TYPES = (QObject, QPixmap, QIcon, QImage)
+_qt_counted = {}  # type -> whether count_qt_objects counts it
+
+
+def current_rss_kib():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0  # Windows
+    # No procfs: peak RSS is the best the platform offers (bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def count_qt_objects():
+    # Only objects with a Python wrapper are visible; C++-owned children are not.
+    # isinstance() against sip types is slow (more so under tracemalloc), so the
+    # answer is remembered per type
+    counts = {}
+    for obj in gc.get_objects():
+        kind = type(obj)
+        counted = _qt_counted.get(kind)
+        if counted is None:
+            counted = _qt_counted[kind] = issubclass(kind, QT_COUNTED_TYPES)
+        if counted:
+            counts[kind.__name__] = counts.get(kind.__name__, 0) + 1
+    return counts
+
+
+class OverrideCursorCounter:
+    # Qt has no getter for the override-cursor stack depth, and unwinding the stack to
+    # measure it costs more the deeper it gets, so pushes and pops are counted instead
+    def __init__(self):
+        self.depth = 0
+        self._push = None
+        self._pop = None
+
+    def install(self):
+        if self._push is not None:
+            return
+        self._push, self._pop = QApplication.setOverrideCursor, QApplication.restoreOverrideCursor
+        QApplication.setOverrideCursor = staticmethod(self.push)
+        QApplication.restoreOverrideCursor = staticmethod(self.pop)
+
+    def push(self, cursor):
+        self._push(cursor)
+        self.depth += 1
+
+    def pop(self):
+        if QApplication.overrideCursor() is not None:
+            self.depth -= 1
+        self._pop()
+
+
+def library_name(filename):
+    parts = filename.replace("\\", "/").split("/")
+    for marker in ("site-packages", "dist-packages"):
+        if marker in parts:
+            i = len(parts) - 1 - parts[::-1].index(marker)
+            if i + 1 < len(parts):
+                return parts[i + 1].split(".")[0]
+    return "python"
+
+
+class MemoryMonitor(QObject):
+    reported = pyqtSignal(str, bool)  # one-line summary, requested by the user
+
+    def __init__(self, enabled=False, interval_s=60, log_path=None, frames=10):
+        super().__init__()
+        self.enabled = enabled
+        self.interval_s = interval_s
+        self.log_path = log_path or os.path.join(os.path.expanduser("~"), ".klydio", "memtrace.jsonl")
+        self.frames = frames
+        self.gauges = {}
+        self.baseline = None
+        self.started = 0.0
+        self.cursors = OverrideCursorCounter()
+        self._timer = None
+        self._ranges = None
+        self._range_starts = None
+        self._jobs = queue.Queue()
+        self._worker = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=os.environ.get("KLYDIO_MEMTRACE", "0") not in ("", "0"),
+            interval_s=float(os.environ.get("KLYDIO_MEMTRACE_INTERVAL", 60)),
+            log_path=os.environ.get("KLYDIO_MEMTRACE_LOG") or None,
+        )
+
+    def add_gauge(self, name, func):
+        # func returns a number, or None when there is nothing to measure right now
+        if self.enabled:
+            self.gauges[name] = func
+
+    def start(self):
+        if not self.enabled or self._timer is not None:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.started = time.monotonic()
+        self.cursors.install()
+        self.add_gauge("override cursors", lambda: self.cursors.depth)
+        # Grouping tracemalloc statistics takes a while; only the snapshot is taken on
+        # the GUI thread, the rest happens here, one report at a time
+        self._worker = threading.Thread(target=self._process_reports, name="memory-report", daemon=True)
+        self._worker.start()
+        self._timer = QTimer()
+        self._timer.setInterval(int(self.interval_s * 1000))
+        self._timer.timeout.connect(self.report)
+        self._timer.start()
+        self.report()
+
+    def stop(self):
+        if self._timer is None:
+            return
+        self._timer.stop()
+        self._timer = None
+        self.report()
+        self._jobs.put(None)
+        self._worker.join(30)  # let the last sample reach the log
+        self._worker = None
+
+    def subsystem(self, traceback):
+        # Innermost frame in this file decides, mapped to its top-level class or function
+        if self._ranges is None:
+            with open(__file__, encoding="utf-8") as f:
+                tree = ast.parse(f.read())
+            self._ranges = sorted((node.lineno, node.end_lineno, node.name) for node in tree.body
+                                  if isinstance(node, (ast.ClassDef, ast.FunctionDef)))
+            self._range_starts = [r[0] for r in self._ranges]
+
+        for frame in reversed(traceback):
+            if frame.filename == __file__:
+                i = bisect.bisect_right(self._range_starts, frame.lineno) - 1
+                if i >= 0 and frame.lineno <= self._ranges[i][1]:
+                    return self._ranges[i][2]
+                return "<module>"
+        return "lib:" + library_name(traceback[-1].filename)
+
+    def python_allocations(self, snapshot):
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        groups = {}
+        for stat in snapshot.statistics("traceback"):
+            name = self.subsystem(stat.traceback)
+            groups[name] = groups.get(name, 0) + stat.size
+        return {name: size // 1024 for name, size in groups.items()}
+
+    def sample(self):
+        gauges = {}
+        for name, func in self.gauges.items():
+            try:
+                gauges[name] = func()
+            except Exception as e:
+                gauges[name] = None
+                print(f"Memory gauge {name} failed: {e}")
+        return {
+            "elapsed_s": round(time.monotonic() - self.started, 1),
+            "rss_kib": current_rss_kib(),
+            "python_kib": {},  # filled in from the snapshot on the worker
+            "qt_objects": count_qt_objects(),
+            "gauges": gauges,
+        }
+
+    def deltas(self, sample):
+        base = self.baseline
+        delta = {"rss_kib": sample["rss_kib"] - base["rss_kib"]}
+        for section in ("python_kib", "qt_objects", "gauges"):
+            changed = {}
+            for name, value in sample[section].items():
+                before = base[section].get(name) or 0
+                if value is not None and value != before:
+                    changed[name] = value - before
+            delta[section] = changed
+        return delta
+
+    def report(self, requested=False):
+        # Takes a sample here; the worker logs it and emits reported with a summary
+        if not self.enabled or self._worker is None:
+            return
+        with TRACE.span("memory sample", "memory"):
+            sample = self.sample()
+            snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        self._jobs.put((sample, snapshot, requested))
+
+    def _process_reports(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            sample, snapshot, requested = job
+            try:
+                if snapshot is not None:
+                    sample["python_kib"] = self.python_allocations(snapshot)
+                summary = self.summarize(sample)
+            except Exception as e:
+                summary = f"Memory report failed: {e}"
+                print(summary)
+            self.reported.emit(summary, requested)
+
+    def summarize(self, sample):
+        # Appends the sample to the log and returns a one-line summary
+        if self.baseline is None:
+            self.baseline = sample
+        sample["delta"] = delta = self.deltas(sample)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(sample) + "\n")
+        except OSError as e:
+            print(f"Could not write memory log: {e}")
+
+        growth = [(value, f"{name} {value:+d} KiB") for name, value in delta["python_kib"].items()]
+        growth += [(value, f"{name} {value:+d}") for name, value in delta["qt_objects"].items()]
+        growth += [(value, f"{name} {value:+g}") for name, value in delta["gauges"].items()]
+        top = ", ".join(text for value, text in sorted(growth, reverse=True)[:4] if value > 0)
+        summary = f"RSS {sample['rss_kib'] // 1024} MiB ({delta['rss_kib'] // 1024:+d} MiB)"
+        summary += f" · {top}" if top else ""
+        print(f"Memory: {summary}")
+        return summary
+
+
+MEMORY = MemoryMonitor.from_env()
+
+
+# --- Settings ---
+
+SETTINGS_PATH = os.path.join(os.path.expanduser("~"), ".klydio", "settings.json")
+
+# key -> (type, default, allowed values or (min, max) or None)
+SETTINGS_SCHEMA = {
+    "profile": (str, "desktop", ("desktop", "low-core", "custom")),
+    "decoder.threads": (int, 0, (0, 64)),  # 0 lets mpv pick from the core count
+    "decoder.framedrop": (str, "vo", ("no", "vo", "decoder", "decoder+vo")),
+    "video.scaler": (str, "bicubic", ("fast-bilinear", "bilinear", "bicubic", "spline", "lanczos")),
+    "video.sync": (str, "audio", ("audio", "display-resample", "display-vdrop", "display-adrop")),
+    "cache.max_mib": (int, 150, (8, 4096)),
+    "cache.back_mib": (int, 50, (0, 4096)),
+    "cache.secs": (int, 3600, (1, 36000)),
+    "wall.thread_budget": (int, 0, (0, 256)),  # wall decoder threads, at least one per playing clip; 0 = core count
+    "export.dir": (str, "", None),  # empty means ~/Videos, or the home directory
+    "export.max_jobs": (int, 2, (1, 8)),
+    "server.enabled": (bool, False, None),
+    "server.root": (str, "", None),
+    "server.host": (str, "0.0.0.0", None),
+    "server.port": (int, 8088, (1024, 65535)),
+    "server.max_streams": (int, 8, (1, 256)),
+    "scenes.enabled": (bool, True, None),
+    "keymap": (dict, {}, None),
+}
+
+PERFORMANCE_PROFILES = {
+    "desktop": {
+        "decoder.threads": 0,
+        "decoder.framedrop": "vo",
+        "video.scaler": "bicubic",
+        "video.sync": "audio",
+        "cache.max_mib": 150,
+        "cache.back_mib": 50,
+        "cache.secs": 3600,
+    },
+    # Small kiosks: fewer decoder threads, cheap scaling, drop early, small caches
+    "low-core": {
+        "decoder.threads": 2,
+        "decoder.framedrop": "decoder+vo",
+        "video.scaler": "fast-bilinear",
+        "video.sync": "audio",
+        "cache.max_mib": 32,
+        "cache.back_mib": 8,
+        "cache.secs": 20,
+    },
+}
+
+# setting -> (mpv option, value formatter)
+MPV_SETTINGS = {
+    "decoder.threads": ("vd-lavc-threads", str),
+    "decoder.framedrop": ("framedrop", str),
+    "video.scaler": ("sws-scaler", str),
+    "video.sync": ("video-sync", str),
+    "cache.max_mib": ("demuxer-max-bytes", lambda v: f"{v}MiB"),
+    "cache.back_mib": ("demuxer-max-back-bytes", lambda v: f"{v}MiB"),
+    "cache.secs": ("cache-secs", str),
+}
+
+
+def atomic_write(path, data):
+    # Write to a temp file in the same directory, then rename over the target,
+    # so a crash mid-write never leaves a truncated file behind
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def media_cache_name(path):
+    # Cache file stem for per-file data; changes when the file is replaced or edited
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def mpv_options_from_settings(settings):
+    options = {}
+    for key, (option, fmt) in MPV_SETTINGS.items():
+        options[option.replace("-", "_")] = fmt(settings.get(key))
+    return options
+
+
+class SettingsStore(QObject):
+    changed = pyqtSignal(str, object)
+
+    def __init__(self, path=SETTINGS_PATH, save_delay_ms=750, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.values = {key: (dict(default) if kind is dict else default)
+                       for key, (kind, default, _) in SETTINGS_SCHEMA.items()}
+        self.values.update(self._load())
+
+        # Every set() restarts this timer, so a burst of changes costs one write
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(save_delay_ms)
+        self._save_timer.timeout.connect(self.save_now)
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Could not read settings from {self.path}: {e}")
+            return {}
+        if not isinstance(data, dict):
+            print(f"Could not read settings from {self.path}: not a JSON object")
+            return {}
+
+        loaded = {}
+        for key, value in data.items():
+            if key not in SETTINGS_SCHEMA:
+                continue
+            try:
+                loaded[key] = self.coerce(key, value)
+            except (TypeError, ValueError) as e:
+                print(f"Ignoring setting {key}: {e}")
+        return loaded
+
+    @staticmethod
+    def coerce(key, value):
+        kind, _, allowed = SETTINGS_SCHEMA[key]
+        if kind is bool and isinstance(value, str):
+            value = value.lower() in ("1", "true", "yes", "on")
+        value = kind(value)
+        if allowed is None:
+            return value
+        if kind in (int, float):
+            low, high = allowed
+            if not low <= value <= high:
+                raise ValueError(f"{key} must be between {low} and {high}")
+        elif value not in allowed:
+            raise ValueError(f"{key} must be one of: {', '.join(allowed)}")
+        return value
+
+    def get(self, key):
+        return self.values[key]
+
+    def set(self, key, value):
+        value = self.coerce(key, value)
+        if self.values.get(key) == value:
+            return
+        self.values[key] = value
+        self._save_timer.start()
+        self.changed.emit(key, value)
+
+    def apply_profile(self, name):
+        for key, value in PERFORMANCE_PROFILES[name].items():
+            self.set(key, value)
+        self.set("profile", name)
+
+    def flush(self):
+        if self._save_timer.isActive():
+            self.save_now()
+
+    def save_now(self):
+        self._save_timer.stop()
+        data = json.dumps(self.values, indent=2, sort_keys=True)
+        try:
+            atomic_write(self.path, data.encode("utf-8"))
+        except OSError as e:
+            print(f"Could not save settings to {self.path}: {e}")
+
+# --- Keymap ---
+# Action -> key sequences in QKeySequence text form. Each action may have several
+# bindings, and a binding may be a chord of up to four keys ("Ctrl+K, Ctrl+F").
+# Override per deployment with the "keymap" setting in the settings file, e.g.
+#   {"keymap": {"seek_forward": ["Right", "Media Next"]}}
+DEFAULT_KEYMAP = {
+    "toggle_fullscreen": ["F"],
+    "exit_fullscreen": ["Escape"],
+    "play_pause": ["Space"],
+    "seek_forward": ["Right"],
+    "seek_backward": ["Left"],
+    "volume_up": ["Up"],
+    "volume_down": ["Down"],
+    "dump_trace": ["Ctrl+Shift+T"],
+    "mark_in": ["I"],
+    "mark_out": ["O"],
+    "export_clip": ["Ctrl+E"],
+    "export_gif": ["Ctrl+G"],
+    "screenshot": ["Ctrl+S"],
+    "cancel_exports": ["Ctrl+Shift+E"],
+    "subtitle_search": ["Ctrl+F", "/"],
+    "next_scene": ["Ctrl+Right", "PgDown"],
+    "previous_scene": ["Ctrl+Left", "PgUp"],
+    "memory_report": ["Ctrl+Shift+M"],
+}
+
+
+def load_keymap(overrides=None):
+    keymap = {action: list(keys) for action, keys in DEFAULT_KEYMAP.items()}
+    for action, keys in (overrides or {}).items():
+        if action not in keymap:
+            print(f"Unknown keymap action: {action}")
+            continue
+        keymap[action] = [keys] if isinstance(keys, str) else list(keys)
+    return keymap
+
+
+class RepeatAccelerator:
+    # Grows the step while a key is held (auto-repeat) or tapped in quick succession
+    def __init__(self, steps=(5, 5, 10, 10, 20, 30, 60), window=0.35):
+        self.steps = steps
+        self.window = window
+        self._streak = 0
+        self._last = 0.0
+
+    def next_step(self):
+        now = time.monotonic()
+        if now - self._last <= self.window:
+            self._streak = min(self._streak + 1, len(self.steps) - 1)
+        else:
+            self._streak = 0
+        self._last = now
+        return self.steps[self._streak]
+
+
+class Keymap:
+    def __init__(self, bindings=None):
+        self.bindings = bindings if bindings is not None else load_keymap()
+        self.shortcuts = {}
+
+    def bind(self, action, widget, handler, context=Qt.WindowShortcut, auto_repeat=True):
+        shortcuts = []
+        for keys in self.bindings.get(action, []):
+            sequence = QKeySequence(keys)
+            if sequence.isEmpty():
+                print(f"Invalid key sequence for {action}: {keys!r}")
+                continue
+            shortcut = QShortcut(sequence, widget)
+            shortcut.setContext(context)
+            shortcut.setAutoRepeat(auto_repeat)
+            shortcut.activated.connect(handler)
+            shortcuts.append(shortcut)
+        self.shortcuts[action] = shortcuts
+        return shortcuts
+
 
 class MouseTrackingFrame(QFrame):
     mouse_moved = pyqtSignal()
@@ -19,10 +681,70 @@ class MouseTrackingFrame(QFrame):
         self.mouse_moved.emit()
         super().mouseMoveEvent(event)
 
+class MarkedSlider(QSlider):
+    # Slider that draws tick marks (scene cuts) over its groove
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.marks = []
+        self.mark_pen = QPen(QColor("#ffcc00"), 2)
+
+    def set_marks(self, fractions):
+        self.marks = fractions
+        self.update()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.marks:
+            return
+        option = QStyleOptionSlider()
+        self.initStyleOption(option)
+        groove = self.style().subControlRect(QStyle.CC_Slider, option, QStyle.SC_SliderGroove, self)
+        painter = QPainter(self)
+        painter.setPen(self.mark_pen)
+        top, bottom = groove.center().y() - 4, groove.center().y() + 4
+        for fraction in self.marks:
+            x = groove.left() + int(fraction * groove.width())
+            painter.drawLine(x, top, x, bottom)
+        painter.end()
+
 from mpv import MPV
 
+def demuxer_cache_kib(player_mpv):
+    try:
+        state = player_mpv.demuxer_cache_state
+    except AttributeError:
+        return None  # nothing loaded
+    if not state:
+        return None
+    return state.get("total-bytes", 0) // 1024
+
+
+def format_time(seconds):
+    seconds = int(seconds)
+    m, s = divmod(seconds, 60)
+    return f"{m:02d}:{s:02d}"
+
+
+def encode_thumbnail(frame, width=None):
+    # frame is mpv's screenshot-raw result; returns JPEG bytes, or None
+    if not frame or frame.get("format") != "bgr0":
+        return None
+    image = QImage(frame["data"], frame["w"], frame["h"], frame["stride"], QImage.Format_RGB32)
+    image = image.scaledToWidth(width or THUMBNAIL_WIDTH, Qt.SmoothTransformation)
+    buffer = QBuffer()
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "JPEG", 80)
+    return bytes(buffer.data())
+
+
 class MPVPlayer(QWidget):
-    def __init__(self, parent=None):
+    playback_state_changed = pyqtSignal(bool)  # True while a file is playing unpaused
+    file_changed = pyqtSignal(str)
+    duration_changed = pyqtSignal(str, float)  # path, seconds
+    file_left = pyqtSignal(str, float, float)  # path, position, duration
+    thumbnail_captured = pyqtSignal(str, bytes)  # path, JPEG
+
+    def __init__(self, parent=None, mpv_options=None):
         super().__init__(parent)
 
         self.setStyleSheet("background-color: #1e1e1e;")
@@ -76,7 +798,7 @@ class MPVPlayer(QWidget):
         self.timestamp.setStyleSheet("color: #ccc; font-size: 14px;")
         overlay_layout.addWidget(self.timestamp)
 
-        self.progress_bar = QSlider(Qt.Horizontal)
+        self.progress_bar = MarkedSlider(Qt.Horizontal)
         self.progress_bar.setRange(0, 1000)
         self.progress_bar.sliderMoved.connect(self.set_position)
         overlay_layout.addWidget(self.progress_bar)
@@ -148,24 +870,37 @@ class MPVPlayer(QWidget):
         main_layout.addWidget(self.wrapper)
 
         # MPV instance
-        self.mpv = MPV(
-            wid=str(int(self.video_frame.winId())),
+        options = dict(
             input_default_bindings=True,
             input_vo_keyboard=True,
             osc=False
         )
+        options.update(mpv_options or {})  # e.g. vo='null', ao='null' for headless runs
+        self.mpv = MPV(wid=str(int(self.video_frame.winId())), **options)
 
         # --- Connect MPV events ---
         self.mpv.event_callback('file-loaded')(self.on_file_loaded)
         self.mpv.observe_property('pause', self.on_pause_change)
         self.mpv.observe_property('time-pos', self.on_time_pos_change)
         self.mpv.observe_property('duration', self.on_duration_change)
+        self.mpv.observe_property('path', self.on_path_change)
+        if TRACE.enabled:
+            self.mpv.event_callback('playback-restart')(self.on_playback_restart)
 
         # State
         self.playing = False
         self.paused = False
         self.current_time = 0
         self.total_time = 0
+        self.current_file = None
+        self.search_panel = None
+        self.scene_cuts = []
+        self.mark_in = None
+        self.mark_out = None
+        self._load_started = 0
+        self._seek_started = 0
+        self.seek_forward_accel = RepeatAccelerator()
+        self.seek_backward_accel = RepeatAccelerator()
 
         # Timers
         self.cursor_timer = QTimer(self)
@@ -256,36 +991,132 @@ class MPVPlayer(QWidget):
             (self.video_frame.width() - self.buffering.width()) // 2,
             (self.video_frame.height() - self.buffering.height()) // 2
         )
-
-    def play_file(self, filepath):
-        self.mpv.play(filepath)
+        self.place_search_panel()
+
+    def attach_search_panel(self, panel):
+        # video_frame's winId() already made its siblings native; a plain child added
+        # now would be stacked under mpv's native surface
+        panel.setAttribute(Qt.WA_NativeWindow)
+        panel.setParent(self.wrapper)
+        panel.hide()
+        self.search_panel = panel
+        self.place_search_panel()
+
+    def place_search_panel(self):
+        if self.search_panel is not None:
+            self.search_panel.setFixedHeight(max(120, self.wrapper.height() - 120))
+            self.search_panel.move(self.wrapper.width() - self.search_panel.width() - 20, 20)
+
+    def play_file(self, filepath, start=None):
+        self._load_started = TRACE.now()
+        self.capture_thumbnail_async()  # queued in mpv ahead of the loadfile below
+        self.leave_file()
+        self.current_file = filepath
+        self.mark_in = self.mark_out = None
+        self.scene_cuts = []
+        self.progress_bar.set_marks([])
+        if start:
+            # Starting at the position avoids decoding from 0 and then seeking
+            self.mpv.loadfile(filepath, start=f"{start:.3f}")
+        else:
+            self.mpv.play(filepath)
         self.buffering.show()
         self.placeholder.hide()
 
     def on_file_loaded(self, event):
+        TRACE.complete("file load", "mpv", self._load_started)
+        self._load_started = 0
         self.playing = True
         self.paused = False
         self.video_loaded = True  # <-- add this
         self.buffering.hide()
         self.update_play_pause_icon()
+        self.playback_state_changed.emit(True)
+
+
+    def on_path_change(self, name, value):
+        # Also fires when mpv advances through the queue on its own
+        if value is None:
+            return
+        if value != self.current_file:
+            self.leave_file()
+            self.current_file = value
+            self.mark_in = self.mark_out = None
+            self.scene_cuts = []
+            self.progress_bar.set_marks([])
+        self.file_changed.emit(value)
+
+    def leave_file(self):
+        if self.current_file and self.playing:
+            self.file_left.emit(self.current_file, self.current_time, self.total_time)
+
+    def capture_thumbnail(self):
+        # Blocking; only for shutdown, where there is no later to deliver to
+        if not self.video_loaded:
+            return None
+        try:
+            frame = self.mpv.command('screenshot-raw', 'video')
+        except Exception:
+            return None  # no video output (audio files, vo=null)
+        return encode_thumbnail(frame)
+
+    def capture_thumbnail_async(self):
+        # mpv copies the frame on its own thread, the scale and JPEG encode run on
+        # a worker, and the result arrives as thumbnail_captured
+        if not self.video_loaded or not self.current_file:
+            return
+        path = self.current_file
+
+        def encode(frame):
+            thumbnail = encode_thumbnail(frame)
+            if thumbnail:
+                self.thumbnail_captured.emit(path, thumbnail)
 
+        def on_frame(error, frame):
+            if not error:
+                threading.Thread(target=encode, args=(frame,), name="thumbnail", daemon=True).start()
+
+        try:
+            self.mpv.command_async('screenshot-raw', 'video', callback=on_frame)
+        except Exception:
+            pass  # player shutting down
+
+    def enqueue(self, paths, replace=False):
+        # Starts playback with the first path if nothing is queued, appends the rest
+        if not paths:
+            return
+        if replace or self.current_file is None:
+            self.play_file(paths[0])
+            paths = paths[1:]
+        # Queued without waiting for mpv, so a big folder doesn't hold up the GUI thread
+        for path in paths:
+            self.mpv.command_async('loadfile', path, 'append')
 
     def on_pause_change(self, name, value):
         self.paused = value
         self.update_play_pause_icon()
+        self.playback_state_changed.emit(self.playing and not value)
 
     def on_time_pos_change(self, name, value):
         if self.playing and value is not None:
-            self.current_time = value
-            self.update_timestamp()
+            with TRACE.span("time-pos update", "mpv"):
+                self.current_time = value
+                self.update_timestamp()
+
+    def on_playback_restart(self, event):
+        TRACE.complete("seek", "mpv", self._seek_started)
+        self._seek_started = 0
 
     def on_duration_change(self, name, value):
         if self.playing and value is not None:
             self.total_time = value
             self.update_timestamp()
+            if self.current_file:
+                self.duration_changed.emit(self.current_file, value)
     
     def set_active(self, active):
         if active:
+            self.setFocus()
             self.cursor_timer.start()
             self.cursor_hide_timer.start()
         else:
@@ -304,7 +1135,7 @@ class MPVPlayer(QWidget):
 
     def update_timestamp(self):
         if self.total_time > 0:
-            self.timestamp.setText(f"{self._format_time(self.current_time)} / {self._format_time(self.total_time)}")
+            self.timestamp.setText(f"{format_time(self.current_time)} / {format_time(self.total_time)}")
             self.progress_bar.setValue(int((self.current_time / self.total_time) * 1000))
         else:
             self.timestamp.setText("00:00 / 00:00")
@@ -322,40 +1153,105 @@ class MPVPlayer(QWidget):
 
     def set_position(self, value):
         if self.playing and self.total_time > 0:
+            self._seek_started = TRACE.now()
             self.mpv.seek((value / 1000.0) * self.total_time, reference='absolute')
 
     def set_volume(self, value):
         self.mpv.volume = value
 
-    def _format_time(self, seconds):
-        seconds = int(seconds)
-        m, s = divmod(seconds, 60)
-        return f"{m:02d}:{s:02d}"
-
-    def keyPressEvent(self, event):
-        if not self.playing:
+    def bind_keys(self, keymap):
+        # Player keys only fire while the player page has focus
+        context = Qt.WidgetWithChildrenShortcut
+        keymap.bind("play_pause", self, self.toggle_play_pause, context, auto_repeat=False)
+        keymap.bind("seek_forward", self, lambda: self.seek_relative(self.seek_forward_accel.next_step()), context)
+        keymap.bind("seek_backward", self, lambda: self.seek_relative(-self.seek_backward_accel.next_step()), context)
+        keymap.bind("volume_up", self, lambda: self.change_volume(5), context)
+        keymap.bind("volume_down", self, lambda: self.change_volume(-5), context)
+        keymap.bind("next_scene", self, self.next_scene, context)
+        keymap.bind("previous_scene", self, self.previous_scene, context)
+
+    def set_scene_cuts(self, path, cuts):
+        if path != self.current_file:
             return
+        self.scene_cuts = cuts
+        if self.total_time > 0:
+            self.progress_bar.set_marks([cut / self.total_time for cut in cuts])
+
+    def scene_points(self):
+        # Detected cuts, or the file's own chapters while there are none (streams,
+        # analysis disabled or not far enough yet)
+        if self.scene_cuts:
+            return self.scene_cuts
+        try:
+            chapters = self.mpv.chapter_list or []
+        except AttributeError:
+            return []
+        return sorted(chapter["time"] for chapter in chapters if "time" in chapter)
+
+    def next_scene(self):
+        points = self.scene_points()
+        i = bisect.bisect_right(points, self.current_time + 0.5)
+        if i < len(points):
+            self.seek_absolute(points[i])
+
+    def previous_scene(self):
+        # Like a CD player: back to the start of this scene, or the one before if near it
+        points = self.scene_points()
+        if not points:
+            return
+        i = bisect.bisect_left(points, self.current_time - 1.0) - 1
+        self.seek_absolute(points[i] if i >= 0 else 0.0)
 
-        if event.key() == Qt.Key_Space:
-            self.toggle_play_pause()
+    def apply_setting(self, key, value):
+        # Frame dropping, sync, scaler and cache limits take effect immediately;
+        # the decoder thread count is picked up when the next file is opened
+        if key not in MPV_SETTINGS:
+            return
+        option, fmt = MPV_SETTINGS[key]
+        try:
+            self.mpv[option] = fmt(value)
+        except Exception as e:
+            print(f"Could not apply {option}={value}: {e}")
 
-        elif event.key() == Qt.Key_Left:
-            self.mpv.command('seek', -5)
+    def seek_absolute(self, seconds):
+        if not self.playing:
+            return
+        self._seek_started = TRACE.now()
+        self.mpv.seek(seconds, reference='absolute')
 
-        elif event.key() == Qt.Key_Right:
-            self.mpv.command('seek', 5)
+    def seek_relative(self, seconds):
+        if not self.playing:
+            return
+        self._seek_started = TRACE.now()
+        self.mpv.command('seek', seconds)
 
-        elif event.key() == Qt.Key_Up:
-            volume = self.mpv.volume or 50
-            volume = min(volume + 5, 100)
-            self.mpv.volume = volume
-            self.volume_slider.setValue(int(volume))
+    def set_mark_in(self):
+        if self.playing:
+            self.mark_in = self.current_time
+            if self.mark_out is not None and self.mark_out <= self.mark_in:
+                self.mark_out = None
+        return self.mark_in
+
+    def set_mark_out(self):
+        if self.playing and (self.mark_in is None or self.current_time > self.mark_in):
+            self.mark_out = self.current_time
+        return self.mark_out
+
+    def export_range(self, default_length=10):
+        # Marked range if there is one, otherwise default_length seconds from here
+        start = self.mark_in if self.mark_in is not None else self.current_time
+        end = self.mark_out if self.mark_out is not None else start + default_length
+        if self.total_time > 0:
+            end = min(end, self.total_time)
+        return start, end
 
-        elif event.key() == Qt.Key_Down:
-            volume = self.mpv.volume or 50
-            volume = max(volume - 5, 0)
-            self.mpv.volume = volume
-            self.volume_slider.setValue(int(volume))
+    def change_volume(self, delta):
+        if not self.playing:
+            return
+        volume = self.mpv.volume or 50
+        volume = max(0, min(volume + delta, 100))
+        self.mpv.volume = volume
+        self.volume_slider.setValue(int(volume))
 
 
 class SpinningLogo(QLabel):
@@ -381,9 +1277,10 @@ class SpinningLogo(QLabel):
 
     def set_angle(self, value):
         self._angle = value
-        transform = QTransform().rotate(value)
-        rotated_pixmap = self.original_pixmap.transformed(transform, Qt.SmoothTransformation)
-        self.setPixmap(rotated_pixmap)
+        with TRACE.span("logo rotate"):
+            transform = QTransform().rotate(value)
+            rotated_pixmap = self.original_pixmap.transformed(transform, Qt.SmoothTransformation)
+            self.setPixmap(rotated_pixmap)
 
     angle = pyqtProperty(float, fget=get_angle, fset=set_angle)
 
@@ -412,6 +1309,14 @@ class TopBar(QFrame):
         # Spacer
         self.layout.addSpacerItem(QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
 
+        # Status text (export progress, marks)
+        self.status = QLabel("")
+        self.status.setStyleSheet("color: #aaa; font-size: 13px;")
+        self.layout.addWidget(self.status)
+        self.status_timer = QTimer(self)
+        self.status_timer.setSingleShot(True)
+        self.status_timer.timeout.connect(lambda: self.status.setText(""))
+
             # Minimize button
         self.minimize_btn = self.create_icon_button("icons/minimize.svg")
         self.minimize_btn.setStyleSheet("""
@@ -462,6 +1367,13 @@ class TopBar(QFrame):
 
         self.drag_pos = None
 
+    def show_status(self, text, timeout_ms=0):
+        self.status.setText(text)
+        if timeout_ms:
+            self.status_timer.start(timeout_ms)
+        else:
+            self.status_timer.stop()
+
     def create_icon_button(self, icon_path):
         btn = QPushButton()
         btn.setIcon(QIcon(icon_path))
@@ -505,13 +1417,1884 @@ class TopBar(QFrame):
 
 
 
-class HomeScreen(QWidget): 
+class SettingsPage(QWidget):
+    CHOICE_LABELS = {
+        "profile": "Performance profile",
+        "decoder.framedrop": "Frame dropping",
+        "video.scaler": "Software scaler",
+        "video.sync": "Video sync",
+    }
+    SLIDER_LABELS = {
+        "decoder.threads": "Decoder threads",
+        "cache.max_mib": "Demuxer cache (MiB)",
+        "cache.back_mib": "Back buffer (MiB)",
+        "wall.thread_budget": "Wall decoder threads",
+        "export.max_jobs": "Parallel exports",
+        "server.max_streams": "Max concurrent streams",
+    }
+
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.controls = {}
+        self.value_labels = {}
+
+        self.setStyleSheet("""
+            QGroupBox {
+                border: 1px solid #3a3a3a;
+                border-radius: 8px;
+                margin-top: 18px;
+                padding: 12px;
+                font-size: 16px;
+            }
+            QGroupBox::title {
+                subcontrol-origin: margin;
+                left: 12px;
+                color: #ccc;
+            }
+            QLabel { font-size: 14px; }
+            QComboBox {
+                background-color: #3a3a3a;
+                border-radius: 6px;
+                padding: 4px 8px;
+                min-width: 160px;
+            }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(30, 20, 30, 20)
+
+        group = QGroupBox("Performance")
+        group_layout = QVBoxLayout(group)
+        group_layout.setSpacing(10)
+
+        for key in ("profile", "decoder.framedrop", "video.scaler", "video.sync"):
+            combo = QComboBox()
+            combo.addItems(SETTINGS_SCHEMA[key][2])
+            combo.setCurrentText(settings.get(key))
+            combo.currentTextChanged.connect(lambda text, k=key: self.on_control_changed(k, text))
+            group_layout.addLayout(self.create_row(self.CHOICE_LABELS[key], combo))
+            self.controls[key] = combo
+
+        for key, maximum in (("decoder.threads", 16), ("cache.max_mib", 1024), ("cache.back_mib", 512),
+                             ("wall.thread_budget", 64), ("export.max_jobs", 8)):
+            self.add_slider(group_layout, key, maximum)
+
+        layout.addWidget(group)
+
+        server_group = QGroupBox("LAN streaming")
+        server_layout = QVBoxLayout(server_group)
+        server_layout.setSpacing(10)
+
+        enabled = QCheckBox("Share a folder with other devices")
+        enabled.setChecked(settings.get("server.enabled"))
+        enabled.toggled.connect(lambda checked: self.on_control_changed("server.enabled", checked))
+        server_layout.addWidget(enabled)
+        self.controls["server.enabled"] = enabled
+
+        root_button = QPushButton(settings.get("server.root") or "Choose folder...")
+        root_button.setStyleSheet("background-color: #3a3a3a; border-radius: 6px; padding: 4px 8px;")
+        root_button.clicked.connect(self.choose_server_root)
+        server_layout.addLayout(self.create_row("Shared folder", root_button))
+        self.controls["server.root"] = root_button
+
+        self.add_slider(server_layout, "server.max_streams", 64)
+
+        self.server_status = QLabel("")
+        self.server_status.setStyleSheet("color: #aaa;")
+        server_layout.addWidget(self.server_status)
+
+        layout.addWidget(server_group)
+        layout.addStretch()
+
+        settings.changed.connect(self.on_setting_changed)
+
+    def add_slider(self, layout, key, maximum):
+        low, _ = SETTINGS_SCHEMA[key][2]
+        slider = QSlider(Qt.Horizontal)
+        slider.setRange(low, maximum)
+        slider.setFixedWidth(240)
+        slider.setValue(self.settings.get(key))
+        slider.valueChanged.connect(lambda value, k=key: self.on_control_changed(k, value))
+        value_label = QLabel()
+        value_label.setFixedWidth(50)
+        self.value_labels[key] = value_label
+        self.update_value_label(key, self.settings.get(key))
+
+        row = self.create_row(self.SLIDER_LABELS[key], slider)
+        row.addWidget(value_label)
+        layout.addLayout(row)
+        self.controls[key] = slider
+
+    def choose_server_root(self):
+        folder = QFileDialog.getExistingDirectory(self, "Folder to Share", self.settings.get("server.root"))
+        if folder:
+            self.settings.set("server.root", folder)
+
+    def create_row(self, text, control):
+        row = QHBoxLayout()
+        label = QLabel(text)
+        label.setFixedWidth(200)
+        row.addWidget(label)
+        row.addWidget(control)
+        row.addStretch()
+        return row
+
+    def update_value_label(self, key, value):
+        if key in self.value_labels:
+            auto = key in ("decoder.threads", "wall.thread_budget") and value == 0
+            self.value_labels[key].setText("Auto" if auto else str(value))
+
+    def on_control_changed(self, key, value):
+        if key == "profile":
+            if value in PERFORMANCE_PROFILES:
+                self.settings.apply_profile(value)
+            else:
+                self.settings.set("profile", value)
+            return
+        self.update_value_label(key, value)
+        self.settings.set(key, value)
+        if key in PERFORMANCE_PROFILES["desktop"]:
+            self.settings.set("profile", "custom")
+
+    def on_setting_changed(self, key, value):
+        # Keep controls in sync when a profile rewrites several settings at once
+        control = self.controls.get(key)
+        if control is None:
+            return
+        control.blockSignals(True)
+        if isinstance(control, QComboBox):
+            control.setCurrentText(value)
+        elif isinstance(control, QCheckBox):
+            control.setChecked(value)
+        elif isinstance(control, QPushButton):
+            control.setText(value or "Choose folder...")
+        else:
+            control.setValue(value)
+        control.blockSignals(False)
+        self.update_value_label(key, value)
+
+
+# --- Video wall ---
+
+# Per-tile mpv decoder/filter settings. Background tiles skip loop filtering and
+# non-reference frames, decode at half resolution where the codec supports lowres
+# (MPEG-1/2/4, MJPEG; H.264 and newer ignore it), and are capped at a low frame
+# rate; the focused tile decodes at full quality.
+WALL_TIERS = {
+    "focused": {
+        "vd-lavc-skipframe": "default",
+        "vd-lavc-skiploopfilter": "default",
+        "vd-lavc-o": "",
+        "vf": "",
+    },
+    "background": {
+        "vd-lavc-skipframe": "nonref",
+        "vd-lavc-skiploopfilter": "all",
+        "vd-lavc-o": "lowres=1",
+        "vf": "fps=10",
+    },
+}
+# Options that libavcodec only reads when the decoder is opened
+DECODER_INIT_OPTIONS = ("vd-lavc-threads", "vd-lavc-skipframe", "vd-lavc-skiploopfilter", "vd-lavc-o")
+
+
+class WallTile(QFrame):
+    clicked = pyqtSignal(object)
+    state_changed = pyqtSignal()  # loaded, shown or hidden
+
+    def __init__(self, mpv_options=None, parent=None):
+        super().__init__(parent)
+        self.path = None
+        self.is_loaded = False
+        self.tier = None
+        self.threads = None
+        self.applied = {}
+        self.set_focused(False)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.setSpacing(2)
+
+        self.video_frame = QWidget()
+        self.video_frame.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        layout.addWidget(self.video_frame)
+
+        self.caption = QLabel("")
+        self.caption.setStyleSheet("color: #ccc; font-size: 12px; border: none;")
+        layout.addWidget(self.caption)
+
+        options = dict(
+            osc=False,
+            input_default_bindings=False,
+            input_vo_keyboard=False,
+            input_cursor=False,  # let clicks reach the tile
+            keep_open="yes",
+            loop_file="inf",
+            mute="yes",
+        )
+        options.update(mpv_options or {})
+        self.mpv = MPV(wid=str(int(self.video_frame.winId())), **options)
+        self.mpv.event_callback('file-loaded')(self.on_file_loaded)
+
+    def set_focused(self, focused):
+        color = "#00aaff" if focused else "#2a2a2a"
+        self.setStyleSheet(f"WallTile {{ background-color: #111; border: 2px solid {color}; border-radius: 4px; }}")
+
+    def play_file(self, path):
+        self.path = path
+        self.is_loaded = False
+        self.caption.setText(os.path.basename(path))
+        self.mpv.play(path)
+
+    def on_file_loaded(self, event):
+        # mpv event thread: only flag it and let the GUI thread reschedule
+        self.is_loaded = True
+        self.state_changed.emit()
+
+    def is_on_screen(self):
+        return self.isVisible() and not self.window().isMinimized()
+
+    def apply_tier(self, tier, threads):
+        if tier == "hidden":
+            self.mpv.pause = True
+            self.tier = tier
+            return
+
+        changes = dict(WALL_TIERS[tier])
+        changes["vd-lavc-threads"] = str(threads)
+        needs_reinit = any(self.applied.get(o) != changes[o] for o in DECODER_INIT_OPTIONS)
+        for option, value in changes.items():
+            if self.applied.get(option) == value:
+                continue
+            try:
+                self.mpv[option] = value
+            except Exception as e:
+                # An option this libmpv build lacks costs that one saving, not the wall
+                print(f"Could not apply {option}={value} to {self.path}: {e}")
+                continue
+            self.applied[option] = value
+        if needs_reinit and self.is_loaded:
+            try:
+                self.mpv.command('video-reload')
+            except Exception as e:
+                print(f"Could not reload decoder for {self.path}: {e}")
+
+        self.tier = tier
+        self.threads = threads
+        self.mpv.pause = False
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.clicked.emit(self)
+        super().mousePressEvent(event)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.state_changed.emit()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.state_changed.emit()
+
+    def apply_setting(self, key, value):
+        if key not in MPV_SETTINGS or key == "decoder.threads":
+            return
+        option, fmt = MPV_SETTINGS[key]
+        try:
+            self.mpv[option] = fmt(value)
+        except Exception as e:
+            print(f"Could not apply {option}={value}: {e}")
+
+    def shutdown(self):
+        self.mpv.terminate()
+
+
+class DecodeScheduler(QObject):
+    def __init__(self, thread_budget=0, parent=None):
+        super().__init__(parent)
+        self.thread_budget = thread_budget
+        self.enabled = True
+        self.tiles = []
+        self.focused = None
+
+        # Coalesce bursts of show/hide/load notifications into one pass
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.rebalance)
+
+    def budget(self):
+        return self.thread_budget or os.cpu_count() or 4
+
+    def add_tile(self, tile):
+        self.tiles.append(tile)
+        tile.state_changed.connect(self.schedule)
+        tile.clicked.connect(self.set_focus)
+        self.schedule()
+
+    def remove_tile(self, tile):
+        self.tiles.remove(tile)
+        if self.focused is tile:
+            self.focused = None
+        self.schedule()
+
+    def set_focus(self, tile):
+        if self.focused is not None:
+            self.focused.set_focused(False)
+        self.focused = tile
+        if tile is not None:
+            tile.set_focused(True)
+        self.schedule()
+
+    def set_thread_budget(self, budget):
+        self.thread_budget = budget
+        self.schedule()
+
+    def schedule(self):
+        self._timer.start()
+
+    def plan(self):
+        # tile -> (tier, decoder threads)
+        if not self.enabled:
+            return {tile: ("focused", 0) for tile in self.tiles if tile.path}
+
+        active = [t for t in self.tiles if t.path and t.is_on_screen()]
+        background = [t for t in active if t is not self.focused]
+        plan = {t: ("hidden", 0) for t in self.tiles if t.path and t not in active}
+
+        # Only off-screen tiles pause. Every visible background tile keeps playing,
+        # degraded and on a single decoder thread; the focused tile gets what is left
+        # of the budget, and at least one thread
+        for tile in background:
+            plan[tile] = ("background", 1)
+        if self.focused in active:
+            plan[self.focused] = ("focused", max(1, self.budget() - len(background)))
+        return plan
+
+    def rebalance(self):
+        for tile, (tier, threads) in self.plan().items():
+            if tile.tier != tier or tile.threads != threads:
+                try:
+                    tile.apply_tier(tier, threads)
+                except Exception as e:
+                    print(f"Could not reschedule {tile.path}: {e}")  # e.g. its mpv is shutting down
+
+
+class VideoWall(QWidget):
+    MAX_TILES = 16
+
+    def __init__(self, mpv_options=None, thread_budget=0, parent=None):
+        super().__init__(parent)
+        self.mpv_options = mpv_options
+        self.scheduler = DecodeScheduler(thread_budget, self)
+        self.tiles = []
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        toolbar = QHBoxLayout()
+        add_button = QPushButton("  Add clips")
+        add_button.setIcon(QIcon("icons/folder.svg"))
+        add_button.setIconSize(QSize(20, 20))
+        clear_button = QPushButton("Clear")
+        for btn in (add_button, clear_button):
+            btn.setStyleSheet("""
+                QPushButton {
+                    background-color: #3a3a3a;
+                    color: white;
+                    border-radius: 6px;
+                    padding: 6px 12px;
+                    font-size: 14px;
+                }
+                QPushButton:hover {
+                    background-color: #505050;
+                }
+            """)
+            toolbar.addWidget(btn)
+        toolbar.addStretch()
+        add_button.clicked.connect(self.open_clips)
+        clear_button.clicked.connect(self.clear)
+        layout.addLayout(toolbar)
+
+        self.grid = QGridLayout()
+        self.grid.setSpacing(6)
+        layout.addLayout(self.grid, stretch=1)
+
+    def open_clips(self):
+        files, _ = QFileDialog.getOpenFileNames(self, "Add Clips to Wall", "", "Video Files (*.mp4 *.avi *.mkv *.mov)")
+        if files:
+            self.set_clips([tile.path for tile in self.tiles] + files)
+
+    def set_clips(self, paths):
+        self.clear()
+        paths = paths[:self.MAX_TILES]
+        columns = math.ceil(math.sqrt(len(paths))) if paths else 1
+        for i, path in enumerate(paths):
+            tile = WallTile(self.mpv_options)
+            self.grid.addWidget(tile, i // columns, i % columns)
+            self.tiles.append(tile)
+            self.scheduler.add_tile(tile)
+            tile.play_file(path)
+        if self.tiles:
+            self.scheduler.set_focus(self.tiles[0])
+
+    def clear(self):
+        for tile in self.tiles:
+            self.scheduler.remove_tile(tile)
+            self.grid.removeWidget(tile)
+            tile.shutdown()
+            tile.deleteLater()
+        self.tiles = []
+
+
+# --- Export queue ---
+# Clips, GIFs and screenshots are encoded by ffmpeg in separate processes, at
+# reduced CPU priority, so exporting never competes with the player's decoder.
+
+EXPORTS_PATH = os.path.join(os.path.expanduser("~"), ".klydio", "exports.json")
+EXPORT_JOB_KEYS = {"id", "kind", "source", "start", "end", "output"}
+EXPORT_EXTENSIONS = {"clip": "mp4", "gif": "gif", "screenshot": "png"}
+GIF_FILTER = "fps=12,scale=480:-2:flags=lanczos,split[a][b];[a]palettegen[p];[b][p]paletteuse"
+
+
+def export_command(job, output, playback_active):
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-nostats", "-progress", "pipe:1", "-y"]
+    single = []
+    if playback_active:
+        # -threads is per stream: before -i it caps the decoder, after it the encoder
+        cmd += ["-filter_threads", "1", "-filter_complex_threads", "1"]
+        single = ["-threads", "1"]
+    cmd += single + ["-ss", f"{job['start']:.3f}", "-i", job["source"]] + single
+
+    kind = job["kind"]
+    if kind == "screenshot":
+        cmd += ["-frames:v", "1"]
+    else:
+        cmd += ["-t", f"{job['end'] - job['start']:.3f}"]
+    if kind == "clip":
+        cmd += ["-c:v", "libx264", "-preset", "veryfast", "-crf", "20", "-c:a", "aac"]
+    elif kind == "gif":
+        cmd += ["-filter_complex", GIF_FILTER, "-loop", "0"]
+    return cmd + [output]
+
+
+def export_output_name(job):
+    base = os.path.splitext(os.path.basename(job["source"]))[0]
+    stamp = lambda t: time.strftime("%H-%M-%S", time.gmtime(t))
+    if job["kind"] == "screenshot":
+        name = f"{base}_{stamp(job['start'])}.{int(job['start'] * 1000) % 1000:03d}"
+    else:
+        name = f"{base}_{stamp(job['start'])}-{stamp(job['end'])}"
+    return f"{name}.{EXPORT_EXTENSIONS[job['kind']]}"
+
+
+class ExportQueue(QObject):
+    job_added = pyqtSignal(str)
+    job_progress = pyqtSignal(str, float, float)  # job id, fraction done, ETA in seconds (-1 if unknown)
+    job_finished = pyqtSignal(str, str)  # job id, final state: done / failed / cancelled
+
+    def __init__(self, output_dir="", max_jobs=2, state_path=EXPORTS_PATH, parent=None):
+        super().__init__(parent)
+        self.output_dir = output_dir
+        self.max_jobs = max_jobs
+        self.state_path = state_path
+        self.playback_active = False
+        self.jobs = {}
+        self.processes = {}
+        self._next_id = 1
+        self._closing = False
+        self._load()
+        QTimer.singleShot(0, self._start_pending)
+
+    def _load(self):
+        try:
+            with open(self.state_path) as f:
+                jobs = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Could not read export queue: {e}")
+            return
+        if not isinstance(jobs, list):
+            print("Could not read export queue: not a JSON list")
+            return
+
+        # Jobs interrupted by a restart are queued again from their in-point
+        for job in jobs:
+            if not isinstance(job, dict) or not EXPORT_JOB_KEYS <= job.keys() or not str(job["id"]).isdigit():
+                print(f"Ignoring malformed export job: {job!r}")
+                continue
+            job["state"] = "queued"
+            job["progress"] = 0.0
+            self.jobs[job["id"]] = job
+            self._next_id = max(self._next_id, int(job["id"]) + 1)
+
+    def _save(self):
+        pending = [job for job in self.jobs.values() if job["state"] in ("queued", "running")]
+        try:
+            atomic_write(self.state_path, json.dumps(pending, indent=2).encode("utf-8"))
+        except OSError as e:
+            print(f"Could not save export queue: {e}")
+
+    def resolve_output_dir(self):
+        if self.output_dir:
+            return self.output_dir
+        videos = os.path.join(os.path.expanduser("~"), "Videos")
+        return videos if os.path.isdir(videos) else os.path.expanduser("~")
+
+    def add(self, kind, source, start, end=None):
+        job_id = str(self._next_id)
+        self._next_id += 1
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "source": source,
+            "start": max(0.0, float(start)),
+            "end": float(end) if end is not None else None,
+            "state": "queued",
+            "progress": 0.0,
+        }
+        job["output"] = os.path.join(self.resolve_output_dir(), export_output_name(job))
+        self.jobs[job_id] = job
+        self._save()
+        self.job_added.emit(job_id)
+        self._start_pending()
+        return job_id
+
+    def running(self):
+        return [job for job in self.jobs.values() if job["state"] == "running"]
+
+    def limit(self):
+        return 1 if self.playback_active else self.max_jobs
+
+    def set_max_jobs(self, max_jobs):
+        self.max_jobs = max_jobs
+        self._start_pending()
+
+    def set_playback_active(self, active):
+        self.playback_active = active
+        if active:
+            # Raising niceness is always allowed; lowering it back would need privileges,
+            # so running jobs stay at the lower priority until they finish
+            for job_id in list(self.processes):
+                self._renice(job_id, 19)
+        else:
+            self._start_pending()
+
+    def _renice(self, job_id, niceness):
+        process = self.processes.get(job_id)
+        if process is None or not hasattr(os, "setpriority"):
+            return
+        pid = process.processId()
+        if pid:
+            try:
+                os.setpriority(os.PRIO_PROCESS, pid, niceness)
+            except OSError:
+                pass
+
+    def _start_pending(self):
+        for job in list(self.jobs.values()):
+            if len(self.running()) >= self.limit():
+                break
+            if job["state"] == "queued":
+                self._start(job)
+
+    def _start(self, job):
+        try:
+            os.makedirs(os.path.dirname(job["output"]), exist_ok=True)
+        except OSError as e:
+            # e.g. an unmounted drive; fail the job instead of retrying it on every launch
+            print(f"Export of {job['source']} failed: {e}")
+            job["state"] = "failed"
+            job["error"] = str(e)
+            self._save()
+            self.job_finished.emit(job["id"], "failed")
+            return
+        base, ext = os.path.splitext(job["output"])
+        job["partial"] = f"{base}.part{ext}"
+        job["state"] = "running"
+        job["started_at"] = time.monotonic()
+
+        cmd = export_command(job, job["partial"], self.playback_active)
+        process = QProcess(self)
+        process.readyReadStandardOutput.connect(lambda j=job["id"]: self._on_output(j))
+        process.finished.connect(lambda code, status, j=job["id"]: self._on_finished(j, code, status))
+        process.errorOccurred.connect(lambda error, j=job["id"]: self._on_error(j, error))
+        process.started.connect(lambda j=job["id"]: self._renice(j, 19 if self.playback_active else 10))
+        self.processes[job["id"]] = process
+        process.start(cmd[0], cmd[1:])
+        self._save()
+
+    def _on_output(self, job_id):
+        job = self.jobs[job_id]
+        process = self.processes[job_id]
+        duration = (job["end"] - job["start"]) if job["end"] is not None else None
+        for line in bytes(process.readAllStandardOutput()).decode(errors="replace").splitlines():
+            key, _, value = line.partition("=")
+            if key == "out_time_us" and duration and value.isdigit():
+                job["progress"] = min(1.0, int(value) / 1e6 / duration)
+            elif key == "progress" and value == "end":
+                job["progress"] = 1.0
+            else:
+                continue
+            elapsed = time.monotonic() - job["started_at"]
+            fraction = job["progress"]
+            eta = elapsed * (1 - fraction) / fraction if fraction > 0 else -1.0
+            self.job_progress.emit(job_id, fraction, eta)
+
+    def _on_error(self, job_id, error):
+        if error == QProcess.FailedToStart:
+            print("Export failed: ffmpeg could not be started")
+            self.jobs[job_id]["error"] = "ffmpeg could not be started"
+            self._finish(job_id, "failed")
+
+    def _on_finished(self, job_id, exit_code, exit_status):
+        job = self.jobs.get(job_id)
+        if self._closing or job is None:
+            return
+        if job["state"] == "cancelling":
+            self._finish(job_id, "cancelled")  # killed by cancel(); the partial file is closed now
+            return
+        if job["state"] != "running":
+            return
+        if exit_status == QProcess.NormalExit and exit_code == 0 and os.path.exists(job["partial"]):
+            os.replace(job["partial"], job["output"])
+            self._finish(job_id, "done")
+        else:
+            error = bytes(self.processes[job_id].readAllStandardError()).decode(errors="replace").strip()
+            job["error"] = error.splitlines()[-1] if error else f"ffmpeg exited with {exit_code}"
+            print(f"Export of {job['source']} failed: {job['error']}")
+            self._finish(job_id, "failed")
+
+    def _finish(self, job_id, state):
+        job = self.jobs[job_id]
+        job["state"] = state
+        process = self.processes.pop(job_id, None)
+        if process is not None:
+            process.deleteLater()
+        if state != "done" and os.path.exists(job.get("partial", "")):
+            os.remove(job["partial"])
+        self._save()
+        self.job_finished.emit(job_id, state)
+        self._start_pending()
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None or job["state"] not in ("queued", "running"):
+            return
+        process = self.processes.get(job_id)
+        if process is not None:
+            # _on_finished completes the cancellation once the process is gone
+            job["state"] = "cancelling"
+            process.kill()
+            return
+        self._finish(job_id, "cancelled")
+
+    def cancel_all(self):
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+
+    def shutdown(self):
+        # Leave unfinished jobs in the state file so they resume on next launch
+        self._closing = True
+        for job_id, process in list(self.processes.items()):
+            process.disconnect()  # no callbacks from processes torn down with the app
+            process.kill()
+            try:
+                os.remove(self.jobs[job_id].get("partial", ""))
+            except OSError:
+                pass  # not written yet, or still locked (Windows); the restart overwrites it
+        self._save()
+
+
+# --- LAN streaming server ---
+# A small HTTP/1.1 server on its own asyncio loop thread. File bodies go out via
+# loop.sendfile(), which uses os.sendfile() (zero-copy) on plain TCP sockets.
+
+SHARED_EXTENSIONS = (".mp4", ".m4v", ".avi", ".mkv", ".mov", ".webm", ".ts",
+                     ".mp3", ".m4a", ".flac", ".ogg", ".opus", ".wav", ".m3u", ".m3u8")
+
+RANGE_SPEC_RE = re.compile(r"(\d*)-(\d*)", re.ASCII)
+
+HTTP_REASONS = {200: "OK", 206: "Partial Content", 400: "Bad Request", 404: "Not Found",
+                405: "Method Not Allowed", 416: "Range Not Satisfiable", 503: "Service Unavailable"}
+
+
+def parse_range(header, size):
+    # Returns (start, end) inclusive, None to ignore the header, or "unsatisfiable".
+    # A malformed spec is ignored (RFC 7233 §3.1); only a valid one past the end is a 416
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None  # multipart ranges aren't supported; serve the whole file
+    match = RANGE_SPEC_RE.fullmatch(spec.strip())
+    if match is None or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        length = int(last)
+        if length == 0:
+            return "unsatisfiable"
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return "unsatisfiable"
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+class StreamServer:
+    def __init__(self, root, host="0.0.0.0", port=8088, max_streams=8, keepalive_timeout=15):
+        self.root = os.path.realpath(root)
+        self.host = host
+        self.port = port
+        self.max_streams = max_streams
+        self.keepalive_timeout = keepalive_timeout
+        self.active_streams = 0
+        self.error = None
+        self._connections = {}  # handler task -> writer
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="stream-server", daemon=True)
+        self._thread.start()
+        ready.wait(5)
+        if self.error is not None:
+            raise self.error
+
+    def stop(self):
+        if self._loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(5)
+        except Exception as e:
+            print(f"Stream server shutdown: {e!r}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        self._loop = None
+
+    async def _shutdown(self):
+        # Stop accepting, then cut open connections and their handlers
+        self._server.close()
+        tasks = list(self._connections)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def url(self, host=None):
+        return f"http://{host or socket.gethostname()}:{self.port}/playlist.m3u"
+
+    def _run(self, ready):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._server = loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        except OSError as e:
+            self.error = e
+            ready.set()
+            loop.close()
+            return
+
+        self.port = self._server.sockets[0].getsockname()[1]  # resolved when started on port 0
+        self._loop = loop
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            loop.run_until_complete(self._server.wait_closed())
+            loop.close()
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                request = await asyncio.wait_for(self._read_request(reader), self.keepalive_timeout)
+                if request is None:
+                    break
+                if not await self._respond(writer, *request):
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            pass  # server shutting down; finish quietly
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode("latin-1").split()
+        if len(parts) != 3:
+            raise ValueError("malformed request line")
+        method, target, version = parts
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) > 100:
+                raise ValueError("too many headers")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method, target, headers, keep_alive
+
+    async def _send_head(self, writer, status, headers, keep_alive):
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        if keep_alive:
+            headers["Keep-Alive"] = f"timeout={self.keepalive_timeout}"
+        lines = [f"HTTP/1.1 {status} {HTTP_REASONS[status]}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+    async def _send_simple(self, writer, status, body, keep_alive, content_type="text/plain; charset=utf-8",
+                           extra=None, head_only=False):
+        data = body.encode("utf-8")
+        headers = {"Content-Type": content_type, "Content-Length": str(len(data))}
+        headers.update(extra or {})
+        await self._send_head(writer, status, headers, keep_alive)
+        if not head_only:
+            writer.write(data)
+        await writer.drain()
+        return keep_alive
+
+    async def _respond(self, writer, method, target, headers, keep_alive):
+        if method not in ("GET", "HEAD"):
+            return await self._send_simple(writer, 405, "Method not allowed\n", keep_alive, extra={"Allow": "GET, HEAD"})
+
+        path = urllib.parse.urlsplit(target).path
+        if path in ("/", "/playlist.m3u"):
+            items = await asyncio.get_running_loop().run_in_executor(None, self.library_items)
+            host = headers.get("host", f"{socket.gethostname()}:{self.port}")
+            body = "#EXTM3U\n" + "".join(
+                f"#EXTINF:-1,{os.path.basename(rel)}\nhttp://{host}/media/{urllib.parse.quote(rel)}\n" for rel in items)
+            return await self._send_simple(writer, 200, body, keep_alive, "audio/x-mpegurl", head_only=method == "HEAD")
+        if path.startswith("/media/"):
+            return await self._send_file(writer, method, urllib.parse.unquote(path[len("/media/"):]), headers, keep_alive)
+        return await self._send_simple(writer, 404, "Not found\n", keep_alive)
+
+    def resolve(self, relative):
+        full = os.path.realpath(os.path.join(self.root, relative))
+        if os.path.commonpath([full, self.root]) != self.root:
+            return None  # escapes the shared folder
+        if not full.lower().endswith(SHARED_EXTENSIONS) or not os.path.isfile(full):
+            return None
+        return full
+
+    def library_items(self):
+        items = []
+        for directory, dirs, files in os.walk(self.root):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(SHARED_EXTENSIONS):
+                    items.append(os.path.relpath(os.path.join(directory, name), self.root).replace(os.sep, "/"))
+        return items
+
+    async def _send_file(self, writer, method, relative, headers, keep_alive):
+        path = self.resolve(relative)
+        if path is None:
+            return await self._send_simple(writer, 404, "Not found\n", keep_alive)
+        if self.active_streams >= self.max_streams:
+            return await self._send_simple(writer, 503, "Too many streams\n", False, extra={"Retry-After": "5"})
+
+        size = os.path.getsize(path)
+        start, end, status = 0, size - 1, 200
+        if "range" in headers and size > 0:
+            byte_range = parse_range(headers["range"], size)
+            if byte_range == "unsatisfiable":
+                return await self._send_simple(writer, 416, "", keep_alive, extra={"Content-Range": f"bytes */{size}"})
+            if byte_range is not None:
+                start, end = byte_range
+                status = 206
+
+        response = {
+            "Content-Type": mimetypes.guess_type(path)[0] or "application/octet-stream",
+            "Content-Length": str(end - start + 1 if size else 0),
+            "Accept-Ranges": "bytes",
+        }
+        if status == 206:
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        # Take the slot before the first await so concurrent requests can't all pass the cap check
+        streaming = method != "HEAD" and size > 0
+        if streaming:
+            self.active_streams += 1
+        try:
+            await self._send_head(writer, status, response, keep_alive)
+            if streaming:
+                with open(path, "rb") as f:
+                    await asyncio.get_running_loop().sendfile(writer.transport, f, start, end - start + 1)
+        finally:
+            if streaming:
+                self.active_streams -= 1
+        return keep_alive
+
+
+# --- Subtitle search ---
+# Cues from sidecar .srt/.ass files and embedded text tracks are streamed into an
+# inverted index on a background thread; lookups intersect posting arrays, so
+# search stays in the millisecond range across thousands of hours. Finished
+# indexes are written to ~/.klydio/subtitles and memory-mapped from there, so a
+# file is only parsed again when it changes.
+
+SUBTITLES_DIR = os.path.join(os.path.expanduser("~"), ".klydio", "subtitles")
+SUBTITLE_INDEX_MAGIC = b"KLYSUB01"
+# magic, cues, words, text bytes, word bytes, postings
+SUBTITLE_INDEX_HEADER = struct.Struct("=8s5Q")
+
+SUBTITLE_SIDECARS = (".srt", ".ass", ".ssa")
+TEXT_SUBTITLE_CODECS = ("subrip", "srt", "ass", "ssa", "mov_text", "webvtt", "text")
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+ASS_TAG_RE = re.compile(r"\{[^}]*\}")
+SRT_TIME_RE = re.compile(r"(\d+):(\d\d):(\d\d)[,.](\d{1,3})\s*-->\s*(\d+):(\d\d):(\d\d)[,.](\d{1,3})")
+
+
+def _clock(h, m, s, frac):
+    return int(h) * 3600 + int(m) * 60 + int(s) + int(frac.ljust(3, "0")) / 1000.0
+
+
+def iter_srt_cues(lines):
+    # Yields (start, text) one cue at a time from any iterable of lines
+    start, text = None, []
+    for line in lines:
+        line = line.strip("﻿\r\n")
+        match = SRT_TIME_RE.search(line)
+        if match:
+            start, text = _clock(*match.groups()[:4]), []
+        elif not line.strip():
+            if start is not None and text:
+                yield start, " ".join(text)
+            start, text = None, []
+        elif start is not None:
+            text.append(ASS_TAG_RE.sub("", re.sub(r"<[^>]+>", "", line)).strip())
+    if start is not None and text:
+        yield start, " ".join(text)
+
+
+def iter_ass_cues(lines):
+    fields = None
+    for line in lines:
+        line = line.strip("﻿\r\n")
+        if line.startswith("Format:") and fields is None:
+            fields = [f.strip().lower() for f in line[len("Format:"):].split(",")]
+        elif line.startswith("Dialogue:") and fields:
+            values = line[len("Dialogue:"):].split(",", len(fields) - 1)
+            if len(values) != len(fields):
+                continue
+            cue = dict(zip(fields, values))
+            h, m, s = cue["start"].strip().split(":")
+            sec, _, frac = s.partition(".")
+            text = ASS_TAG_RE.sub("", cue["text"]).replace("\\N", " ").replace("\\n", " ").strip()
+            if text:
+                yield _clock(h, m, sec, frac), text
+
+
+class SubtitleLookup:
+    # Search shared by the in-memory and the memory-mapped index. Subclasses provide
+    # starts, text(cue), posting(word) and prefix_postings(prefix).
+    __slots__ = ()
+
+    def search(self, words):
+        # Every word must match; the last one may be a prefix (search-as-you-type)
+        sets = [set(self.posting(word)) for word in words[:-1]]
+        last = words[-1]
+        if len(last) >= 2:
+            matches = set()
+            for posting in self.prefix_postings(last):
+                matches.update(posting)
+            sets.append(matches)
+        else:
+            sets.append(set(self.posting(last)))
+        sets.sort(key=len)
+        return sorted(sets[0].intersection(*sets[1:]), key=self.starts.__getitem__)
+
+
+class SubtitleFileIndex(SubtitleLookup):
+    # Built while a file is being indexed, then written out and replaced by its mapped copy
+    __slots__ = ("starts", "texts", "postings", "_words")
+
     def __init__(self):
+        self.starts = array("d")
+        self.texts = []
+        self.postings = {}  # word -> array of cue numbers
+        self._words = None  # sorted vocabulary for prefix lookups, rebuilt lazily
+
+    @property
+    def count(self):
+        return len(self.texts)
+
+    def add(self, start, text):
+        cue = len(self.texts)
+        self.starts.append(start)
+        self.texts.append(text)
+        for word in set(WORD_RE.findall(text.lower())):
+            posting = self.postings.get(word)
+            if posting is None:
+                posting = self.postings[word] = array("I")
+                self._words = None
+            posting.append(cue)
+
+    def text(self, cue):
+        return self.texts[cue]
+
+    def posting(self, word):
+        return self.postings.get(word, ())
+
+    def prefix_postings(self, prefix):
+        if self._words is None:
+            self._words = sorted(self.postings)
+        i = bisect.bisect_left(self._words, prefix)
+        while i < len(self._words) and self._words[i].startswith(prefix):
+            yield self.postings[self._words[i]]
+            i += 1
+
+    def to_bytes(self):
+        # Layout read by MappedSubtitleIndex: header, then starts, text offsets, word
+        # offsets, posting offsets and postings as native arrays, then the UTF-8 blobs
+        words = sorted(self.postings)
+        texts = [text.encode("utf-8") for text in self.texts]
+        word_bytes = [word.encode("utf-8") for word in words]
+        text_offsets, word_offsets = array("Q", [0]), array("Q", [0])
+        for text in texts:
+            text_offsets.append(text_offsets[-1] + len(text))
+        for word in word_bytes:
+            word_offsets.append(word_offsets[-1] + len(word))
+        posting_offsets, postings = array("Q", [0]), array("I")
+        for word in words:
+            postings.extend(self.postings[word])
+            posting_offsets.append(len(postings))
+
+        header = SUBTITLE_INDEX_HEADER.pack(SUBTITLE_INDEX_MAGIC, len(texts), len(words),
+                                            text_offsets[-1], word_offsets[-1], len(postings))
+        padding = b"\0" * (-len(postings) * postings.itemsize % 8)
+        return b"".join([header, self.starts.tobytes(), text_offsets.tobytes(), word_offsets.tobytes(),
+                         posting_offsets.tobytes(), postings.tobytes(), padding] + texts + word_bytes)
+
+
+class MappedSubtitleIndex(SubtitleLookup):
+    # Read-only view over a file written by SubtitleFileIndex.to_bytes. Pages are
+    # loaded by the OS on demand, so indexed files cost no Python heap while idle.
+    __slots__ = ("cache_path", "count", "starts", "_map", "_text_offsets", "_word_offsets", "_posting_offsets",
+                 "_postings", "_texts", "_words", "_word_count")
+
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        with open(cache_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        if len(view) < SUBTITLE_INDEX_HEADER.size:
+            raise ValueError("truncated subtitle index")
+        magic, cues, words, text_bytes, word_bytes, postings = SUBTITLE_INDEX_HEADER.unpack_from(view)
+        arrays = 8 * cues + 8 * (cues + 1) + 16 * (words + 1) + 4 * postings
+        if magic != SUBTITLE_INDEX_MAGIC or len(view) != (SUBTITLE_INDEX_HEADER.size + arrays + -4 * postings % 8
+                                                          + text_bytes + word_bytes):
+            raise ValueError("stale or damaged subtitle index")
+
+        position = SUBTITLE_INDEX_HEADER.size
+
+        def take(length, fmt=None):
+            nonlocal position
+            section = view[position:position + length]
+            position += length
+            return section.cast(fmt) if fmt else section
+
+        self.count = cues
+        self._word_count = words
+        self.starts = take(8 * cues, "d")
+        self._text_offsets = take(8 * (cues + 1), "Q")
+        self._word_offsets = take(8 * (words + 1), "Q")
+        self._posting_offsets = take(8 * (words + 1), "Q")
+        self._postings = take(4 * postings, "I")
+        position += -4 * postings % 8
+        self._texts = take(text_bytes)
+        self._words = take(word_bytes)
+
+    def text(self, cue):
+        return bytes(self._texts[self._text_offsets[cue]:self._text_offsets[cue + 1]]).decode("utf-8")
+
+    def _word(self, i):
+        return bytes(self._words[self._word_offsets[i]:self._word_offsets[i + 1]]).decode("utf-8")
+
+    def _posting_at(self, i):
+        return self._postings[self._posting_offsets[i]:self._posting_offsets[i + 1]]
+
+    def _lower_bound(self, word):
+        lo, hi = 0, self._word_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._word(mid) < word:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def posting(self, word):
+        i = self._lower_bound(word)
+        if i < self._word_count and self._word(i) == word:
+            return self._posting_at(i)
+        return ()
+
+    def prefix_postings(self, prefix):
+        i = self._lower_bound(prefix)
+        while i < self._word_count and self._word(i).startswith(prefix):
+            yield self._posting_at(i)
+            i += 1
+
+
+class SubtitleIndex:
+    # Per-file indexes keep a lookup proportional to one file's cues, however
+    # many hours of subtitles have been indexed overall. Only the most recently
+    # used files stay open; the rest are reopened from their cache file on demand.
+    def __init__(self, limit=64):
+        self.lock = threading.Lock()
+        self.limit = limit
+        self.files = {}  # path -> open index, least recently used first
+        self.keys = {}  # path -> media_cache_name at the time it was indexed
+        self.cache_paths = {}  # path -> cache file of its finished index, open or not
+
+    def has(self, path, key):
+        with self.lock:
+            known = path in self.files or path in self.cache_paths
+            return known and self.keys.get(path) == key
+
+    def put(self, path, key, entry):
+        with self.lock:
+            self.files.pop(path, None)  # replaces any stale index for the path
+            self.files[path] = entry
+            self.keys[path] = key
+            if isinstance(entry, MappedSubtitleIndex):
+                self.cache_paths[path] = entry.cache_path
+            else:
+                self.cache_paths.pop(path, None)  # being rebuilt
+            self._evict()
+
+    def _evict(self):
+        while len(self.files) > self.limit:
+            oldest = next(iter(self.files))
+            del self.files[oldest]
+            if oldest not in self.cache_paths:
+                del self.keys[oldest]  # nothing to reopen it from
+
+    def _open(self, path):
+        # Caller holds the lock. An evicted file is mapped again from its cache
+        entry = self.files.get(path)
+        if entry is not None:
+            return entry
+        cache_path = self.cache_paths.get(path)
+        if cache_path is None:
+            return None
+        try:
+            return MappedSubtitleIndex(cache_path)
+        except (OSError, ValueError) as e:
+            print(f"Could not reopen subtitle index for {path}: {e}")
+            del self.cache_paths[path]
+            self.keys.pop(path, None)
+            return None
+
+    def begin_file(self, path, key):
+        entry = SubtitleFileIndex()
+        self.put(path, key, entry)
+        return entry
+
+    def add_cues(self, entry, cues):
+        with self.lock:
+            for start, text in cues:
+                entry.add(start, text)
+
+    def search(self, query, path=None, limit=100):
+        words = WORD_RE.findall(query.lower())
+        if not words:
+            return []
+        results = []
+        with self.lock:
+            if path is not None:
+                entry = self._open(path)
+                if entry is None:
+                    return []
+                self.files.pop(path, None)
+                self.files[path] = entry  # most recently used, kept open
+                self._evict()
+                paths = [path]
+            else:
+                # Closed files are mapped just for this search and not kept open
+                paths = list(self.files) + [p for p in self.cache_paths if p not in self.files]
+            for file_path in paths:
+                entry = self._open(file_path)
+                if entry is None:
+                    continue
+                for cue in entry.search(words):
+                    results.append((file_path, entry.starts[cue], entry.text(cue)))
+                    if len(results) >= limit:
+                        return results
+        return results
+
+
+class SubtitleIndexer(QObject):
+    file_indexed = pyqtSignal(str, int)  # path, cue count
+
+    def __init__(self, index, cache_dir=SUBTITLES_DIR, batch_size=200, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.cache_dir = cache_dir
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="subtitle-indexer", daemon=True)
+        self.thread.start()
+
+    def enqueue(self, path):
+        self.queue.put(path)
+
+    def _run(self):
+        while True:
+            path = self.queue.get()
+            try:
+                key = media_cache_name(path)
+            except OSError:
+                continue
+            if self.index.has(path, key):
+                continue
+            cache_path = os.path.join(self.cache_dir, key + ".idx")
+            try:
+                entry = MappedSubtitleIndex(cache_path)
+            except (OSError, ValueError):
+                entry = None
+            if entry is not None:
+                self.index.put(path, key, entry)
+                self.file_indexed.emit(path, entry.count)
+                continue
+            try:
+                count = self.index_file(path, key, cache_path)
+            except Exception as e:
+                print(f"Subtitle indexing failed for {path}: {e}")
+                continue
+            self.file_indexed.emit(path, count)
+
+    def _feed(self, entry, cues):
+        # Hand cues over in small batches so searches see them while indexing runs
+        count, batch = 0, []
+        for cue in cues:
+            batch.append(cue)
+            if len(batch) >= self.batch_size:
+                self.index.add_cues(entry, batch)
+                count += len(batch)
+                batch = []
+        self.index.add_cues(entry, batch)
+        return count + len(batch)
+
+    def index_file(self, path, key, cache_path):
+        entry = self.index.begin_file(path, key)
+        count, complete = 0, True
+        base = os.path.splitext(path)[0]
+        for ext in SUBTITLE_SIDECARS:
+            sidecar = base + ext
+            if os.path.exists(sidecar):
+                parser = iter_srt_cues if ext == ".srt" else iter_ass_cues
+                with open(sidecar, encoding="utf-8", errors="replace") as f:
+                    count += self._feed(entry, parser(f))
+
+        for stream in self.text_streams(path):
+            # Convert each embedded text track to SRT on the fly and parse as it arrives
+            cmd = ["ffmpeg", "-nostdin", "-v", "error", "-i", path, "-map", f"0:{stream}", "-f", "srt", "-"]
+            with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                  text=True, encoding="utf-8", errors="replace") as proc:
+                count += self._feed(entry, iter_srt_cues(proc.stdout))
+            complete = complete and proc.returncode == 0
+
+        if complete:
+            # Persist, then serve from the mapped copy so the Python-side lists can go
+            try:
+                atomic_write(cache_path, entry.to_bytes())
+                self.index.put(path, key, MappedSubtitleIndex(cache_path))
+            except (OSError, ValueError) as e:
+                print(f"Could not save subtitle index for {path}: {e}")
+        return count
+
+    def text_streams(self, path):
+        cmd = ["ffprobe", "-v", "error", "-select_streams", "s",
+               "-show_entries", "stream=index,codec_name", "-of", "csv=p=0", path]
+        try:
+            output = subprocess.run(cmd, capture_output=True, text=True, timeout=30).stdout
+        except (OSError, subprocess.TimeoutExpired):
+            return []
+        streams = []
+        for line in output.splitlines():
+            index, _, codec = line.partition(",")
+            if codec.strip() in TEXT_SUBTITLE_CODECS and index.isdigit():
+                streams.append(index)
+        return streams
+
+
+class SubtitleSearchPanel(QFrame):
+    def __init__(self, index, player, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.player = player
+        self.setFixedWidth(420)
+        self.setStyleSheet("""
+            SubtitleSearchPanel { background-color: #2e2e2e; border-radius: 10px; }
+            QLineEdit { background-color: #3a3a3a; color: white; border-radius: 6px; padding: 6px; font-size: 14px; }
+            QListWidget { background-color: transparent; color: #ddd; border: none; font-size: 13px; }
+            QListWidget::item:selected { background-color: #00aaff; }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        self.query = QLineEdit()
+        self.query.setPlaceholderText("Search subtitles...")
+        self.query.textChanged.connect(self.run_search)
+        self.query.returnPressed.connect(self.jump_to_current)
+        self.query.installEventFilter(self)
+        layout.addWidget(self.query)
+
+        self.results = QListWidget()
+        self.results.itemActivated.connect(self.jump_to)
+        self.results.itemClicked.connect(self.jump_to)
+        layout.addWidget(self.results)
+
+        self.status = QLabel("")
+        self.status.setStyleSheet("color: #888; font-size: 12px;")
+        layout.addWidget(self.status)
+        self.hide()
+
+    def toggle(self):
+        if self.isVisible():
+            self.hide()
+            self.player.setFocus()
+        else:
+            self.show()
+            self.raise_()
+            self.query.setFocus()
+            self.query.selectAll()
+            self.run_search(self.query.text())
+
+    def run_search(self, text):
+        self.results.clear()
+        if not text.strip():
+            self.status.setText("")
+            return
+        started = time.perf_counter()
+        hits = self.index.search(text, path=self.player.current_file)
+        elapsed = (time.perf_counter() - started) * 1000
+        for _, start, cue in hits:
+            item = QListWidgetItem(f"{format_time(start)}  {cue}")
+            item.setData(Qt.UserRole, start)
+            self.results.addItem(item)
+        self.status.setText(f"{len(hits)} matches in {elapsed:.1f} ms")
+
+    def refresh(self, path):
+        # Called as indexing finishes so new matches show up without retyping
+        if self.isVisible() and path == self.player.current_file:
+            self.run_search(self.query.text())
+
+    def jump_to_current(self):
+        item = self.results.currentItem() or self.results.item(0)
+        if item is not None:
+            self.jump_to(item)
+
+    def eventFilter(self, source, event):
+        # Result navigation keys typed in the search box move through the results
+        # rather than reaching the player's volume and scene shortcuts
+        if source is self.query and event.type() in (QEvent.ShortcutOverride, QEvent.KeyPress) \
+                and event.key() in (Qt.Key_Up, Qt.Key_Down, Qt.Key_PageUp, Qt.Key_PageDown):
+            if event.type() == QEvent.KeyPress:
+                QApplication.sendEvent(self.results, event)
+            event.accept()
+            return True
+        return super().eventFilter(source, event)
+
+    def jump_to(self, item):
+        self.player.seek_absolute(max(0.0, item.data(Qt.UserRole) - 0.5))
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            self.toggle()
+            return
+        super().keyPressEvent(event)
+
+
+# --- Media discovery ---
+# Dropped or command-line paths are expanded on a worker thread; results are
+# streamed to the GUI in batches so playback starts on the first hit.
+
+MEDIA_EXTENSIONS = {
+    ".mp4", ".m4v", ".mkv", ".webm", ".avi", ".mov", ".wmv", ".flv", ".ts", ".m2ts", ".mts", ".mpg", ".mpeg",
+    ".ogv", ".3gp", ".mp3", ".m4a", ".aac", ".flac", ".ogg", ".opus", ".wav", ".wma",
+}
+PLAYLIST_EXTENSIONS = {".m3u", ".m3u8"}
+# Common non-media files skipped without opening them
+SKIP_EXTENSIONS = {
+    ".srt", ".ass", ".ssa", ".vtt", ".sub", ".idx", ".nfo", ".txt", ".jpg", ".jpeg", ".png", ".gif", ".bmp",
+    ".webp", ".pdf", ".json", ".xml", ".html", ".db", ".ini", ".log", ".part", ".torrent", ".zip", ".exe",
+}
+# (offset, magic) pairs for files with unknown extensions
+MEDIA_SIGNATURES = (
+    (4, b"ftyp"),               # MP4 / MOV / M4A / 3GP
+    (0, b"\x1a\x45\xdf\xa3"),   # Matroska / WebM
+    (0, b"OggS"),
+    (0, b"fLaC"),
+    (0, b"ID3"),                # MP3 with ID3 tag
+    (0, b"FLV"),
+    (0, b"\x00\x00\x01\xba"),   # MPEG program stream
+    (0, b"\x30\x26\xb2\x75"),   # ASF / WMV / WMA
+)
+
+
+def sniff_media(path):
+    try:
+        with open(path, "rb") as f:
+            head = f.read(189)
+    except OSError:
+        return False
+    for offset, magic in MEDIA_SIGNATURES:
+        if head[offset:offset + len(magic)] == magic:
+            return True
+    if head[:4] == b"RIFF" and head[8:12] in (b"AVI ", b"WAVE"):
+        return True
+    return len(head) == 189 and head[0] == 0x47 and head[188] == 0x47  # MPEG transport stream
+
+
+def is_media_file(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in MEDIA_EXTENSIONS:
+        return True
+    if ext in SKIP_EXTENSIONS or ext in PLAYLIST_EXTENSIONS:
+        return False
+    return sniff_media(path)
+
+
+def iter_playlist(path):
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if "://" in line:
+                yield line  # stream URL, handed to mpv as-is
+            else:
+                yield os.path.normpath(os.path.join(base, line))
+
+
+def iter_media(paths, stop=None):
+    # Depth-first walk with os.scandir, one directory listing at a time. The stop flag
+    # is checked on every entry, so a huge folder can be abandoned part way through
+    stopped = stop.is_set if stop is not None else (lambda: False)
+    for path in paths:
+        if stopped():
+            return
+        if "://" in path:
+            yield path
+        elif os.path.isdir(path):
+            stack = [path]
+            while stack:
+                directory = stack.pop()
+                entries = []
+                try:
+                    with os.scandir(directory) as it:
+                        for entry in it:
+                            if stopped():
+                                return
+                            entries.append(entry)
+                except OSError:
+                    continue
+                entries.sort(key=lambda e: e.name.lower())
+                subdirs = []
+                for entry in entries:
+                    if stopped():
+                        return
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file() and is_media_file(entry.path):
+                            yield entry.path
+                    except OSError:
+                        continue
+                stack.extend(reversed(subdirs))
+        elif os.path.splitext(path)[1].lower() in PLAYLIST_EXTENSIONS:
+            try:
+                yield from iter_playlist(path)
+            except OSError as e:
+                print(f"Could not read playlist {path}: {e}")
+        elif os.path.isfile(path):
+            yield path  # explicitly chosen files are trusted
+
+
+class MediaScanner(QThread):
+    batch_found = pyqtSignal(list)
+
+    def __init__(self, paths, batch_size=200, batch_interval=0.1, parent=None):
+        super().__init__(parent)
+        self.paths = paths
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.found = 0
+        self._stop = threading.Event()
+
+    def stop(self):
+        # Returns at once; the walk notices within one directory entry and the thread ends
+        self._stop.set()
+
+    def run(self):
+        batch = []
+        last_flush = time.monotonic()
+        for path in iter_media(self.paths, self._stop):
+            if self._stop.is_set():
+                return
+            batch.append(path)
+            self.found += 1
+            # The first hit goes out alone so playback can start straight away
+            if self.found == 1 or len(batch) >= self.batch_size or time.monotonic() - last_flush >= self.batch_interval:
+                self.batch_found.emit(batch)
+                batch = []
+                last_flush = time.monotonic()
+        if batch and not self._stop.is_set():
+            self.batch_found.emit(batch)
+
+
+# --- Scene index ---
+# Cut detection runs ffmpeg's scene score on a downscaled, low frame rate copy
+# of the video, one time range at a time, in a low-priority worker process. The
+# filters only thin out frames after decoding, so the decoder itself is told to
+# skip non-reference frames and, for codecs that support it, decode at lowres.
+# Finished ranges and cuts are cached per file so analysis resumes where it stopped.
+
+SCENES_DIR = os.path.join(os.path.expanduser("~"), ".klydio", "scenes")
+PTS_TIME_RE = re.compile(r"pts_time:\s*([\d.]+)")
+
+
+def merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 0.01:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class SceneAnalyzer(QObject):
+    cuts_changed = pyqtSignal(str, list)  # path, sorted cut times in seconds
+
+    def __init__(self, cache_dir=SCENES_DIR, chunk=120.0, threshold=0.3, throttle_ms=3000,
+                 position_source=None, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        self.chunk = chunk
+        self.threshold = threshold
+        self.throttle_ms = throttle_ms
+        self.position_source = position_source
+        self.playback_active = False
+        self.path = None
+        self.state = None
+        self.process = None
+        self._range = None
+        self._buffer = b""
+
+        self._next_timer = QTimer(self)
+        self._next_timer.setSingleShot(True)
+        self._next_timer.timeout.connect(self._start_next)
+
+    def cache_path(self, path):
+        return os.path.join(self.cache_dir, media_cache_name(path) + ".json")
+
+    def analyze(self, path, duration):
+        if path == self.path and self.state is not None:
+            return
+        self.cancel()
+        try:
+            self.state_path = self.cache_path(path)
+        except OSError:
+            return  # not a local file (stream URL) or gone
+        self.path = path
+        try:
+            with open(self.state_path) as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = None
+        if not isinstance(self.state, dict) or not isinstance(self.state.get("done"), list) \
+                or not isinstance(self.state.get("cuts"), list):
+            self.state = {"path": path, "done": [], "cuts": []}
+        self.state["duration"] = duration
+        if self.state["cuts"]:
+            self.cuts_changed.emit(path, list(self.state["cuts"]))
+        self._next_timer.start(0)
+
+    def cancel(self):
+        self._next_timer.stop()
+        if self.process is not None:
+            # Disowned: it is deleted once it has actually exited
+            process, self.process = self.process, None
+            process.disconnect()
+            process.finished.connect(process.deleteLater)
+            process.kill()
+        self.path = None
+        self.state = None
+
+    def set_playback_active(self, active):
+        self.playback_active = active
+        if active and self.process is not None:
+            self._renice(19)
+
+    def _renice(self, niceness):
+        pid = self.process.processId() if self.process is not None else 0
+        if pid and hasattr(os, "setpriority"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, pid, niceness)
+            except OSError:
+                pass
+
+    def next_range(self):
+        # First unanalysed gap at or after the playback position, else the first gap
+        duration = self.state["duration"]
+        gaps, cursor = [], 0.0
+        for start, end in self.state["done"]:
+            if start > cursor:
+                gaps.append((cursor, start))
+            cursor = max(cursor, end)
+        if cursor < duration - 0.5:
+            gaps.append((cursor, duration))
+        if not gaps:
+            return None
+
+        position = self.position_source() if self.position_source else 0.0
+        start, end = next(((max(s, position), e) for s, e in gaps if e > position + 1), gaps[0])
+        return start, min(end, start + self.chunk)
+
+    def _start_next(self):
+        if self.process is not None or self.state is None:
+            return
+        self._range = self.next_range()
+        if self._range is None:
+            return  # whole file analysed
+        start, end = self._range
+        preroll = max(0.0, start - 1.0)  # the first decoded frame has no scene score
+        self._preroll = preroll
+        self._buffer = b""
+
+        vf = f"fps=5,scale=160:-2,select='gt(scene,{self.threshold})',showinfo"
+        args = ["-hide_banner", "-nostdin", "-nostats", "-loglevel", "info", "-threads", "1",
+                "-skip_loop_filter", "all", "-skip_frame", "noref", "-lowres", "2",
+                "-ss", f"{preroll:.3f}", "-t", f"{end - preroll:.3f}",
+                "-i", self.path, "-an", "-sn", "-dn", "-vf", vf, "-f", "null", "-"]
+        self.process = QProcess(self)
+        self.process.readyReadStandardError.connect(self._on_output)
+        self.process.finished.connect(self._on_finished)
+        self.process.errorOccurred.connect(self._on_error)
+        self.process.started.connect(lambda: self._renice(19 if self.playback_active else 10))
+        self.process.start("ffmpeg", args)
+
+    def _on_error(self, error):
+        if error == QProcess.FailedToStart:
+            print(f"Scene analysis unavailable: {self.process.errorString()}")
+            self.process.deleteLater()
+            self.process = None
+
+    def _on_output(self):
+        self._buffer += bytes(self.process.readAllStandardError())
+        *lines, self._buffer = self._buffer.split(b"\n")
+        start, end = self._range
+        cuts = self.state["cuts"]
+        changed = False
+        for line in lines:
+            if b"showinfo" not in line:
+                continue
+            match = PTS_TIME_RE.search(line.decode(errors="replace"))
+            if not match:
+                continue
+            cut = round(self._preroll + float(match.group(1)), 3)
+            i = bisect.bisect_left(cuts, cut)
+            near = (i < len(cuts) and cuts[i] - cut < 0.1) or (i > 0 and cut - cuts[i - 1] < 0.1)
+            if start <= cut < end and not near:
+                cuts.insert(i, cut)
+                changed = True
+        if changed:
+            self.cuts_changed.emit(self.path, list(cuts))
+
+    def _on_finished(self, exit_code, exit_status):
+        process, self.process = self.process, None
+        process.deleteLater()
+        if exit_status != QProcess.NormalExit or exit_code != 0:
+            print(f"Scene analysis stopped for {self.path} (ffmpeg exit {exit_code})")
+            return
+
+        self.state["done"] = merge_ranges(self.state["done"] + [list(self._range)])
+        try:
+            atomic_write(self.state_path, json.dumps(self.state).encode("utf-8"))
+        except OSError as e:
+            print(f"Could not save scene index: {e}")
+        # Back off between chunks while the main player is busy
+        self._next_timer.start(self.throttle_ms if self.playback_active else 0)
+
+
+# --- Watch history ---
+# The Home page renders from this snapshot alone: titles, positions and thumbnails
+# already scaled to tile size, so nothing heavier is touched before the first paint.
+
+HOME_SNAPSHOT_PATH = os.path.join(os.path.expanduser("~"), ".klydio", "home.json")
+THUMBNAIL_WIDTH = 192
+MAX_HOME_TILES = 5
+HISTORY_ITEM_KEYS = {"path", "title", "position"}
+
+
+class WatchHistory:
+    def __init__(self, path=HOME_SNAPSHOT_PATH, limit=8):
+        self.path = path
+        self.limit = limit
+        self.items = []
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        items = data.get("items") if isinstance(data, dict) else None
+        if isinstance(items, list):
+            # A hand-edited or truncated snapshot must not keep the Home page from opening
+            self.items = [item for item in items
+                          if isinstance(item, dict) and HISTORY_ITEM_KEYS <= item.keys()][:limit]
+
+    def record(self, path, position, duration, thumbnail=None):
+        previous = self.forget(path)
+        if duration and (position > duration * 0.95 or duration - position < 20):
+            return  # watched to the end; nothing to continue
+        if position < 5 and previous is None:
+            return
+        item = {
+            "path": path,
+            "title": os.path.basename(path.rstrip("/")) or path,
+            "position": round(position, 3),
+            "duration": duration or 0,
+            "thumbnail": previous["thumbnail"] if previous else "",
+        }
+        if thumbnail:
+            item["thumbnail"] = base64.b64encode(thumbnail).decode("ascii")
+        self.items.insert(0, item)
+        del self.items[self.limit:]
+
+    def set_thumbnail(self, path, thumbnail):
+        for item in self.items:
+            if item["path"] == path:
+                item["thumbnail"] = base64.b64encode(thumbnail).decode("ascii")
+                return
+
+    def forget(self, path):
+        for i, item in enumerate(self.items):
+            if item["path"] == path:
+                return self.items.pop(i)
+        return None
+
+    def save(self):
+        try:
+            atomic_write(self.path, json.dumps({"items": self.items}).encode("utf-8"))
+        except OSError as e:
+            print(f"Could not save watch history: {e}")
+
+
+class HistoryTile(QFrame):
+    clicked = pyqtSignal(str, float)  # path, position
+
+    def __init__(self, item, parent=None):
+        super().__init__(parent)
+        self.path = item["path"]
+        self.position = item["position"]
+        self.setFixedWidth(THUMBNAIL_WIDTH + 12)
+        self.setCursor(Qt.PointingHandCursor)
+        self.setToolTip(self.path)
+        self.setStyleSheet("""
+            QFrame { background-color: #2a2a2a; border-radius: 6px; }
+            QFrame:hover { background-color: #3a3a3a; }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(6, 6, 6, 6)
+        layout.setSpacing(4)
+
+        thumbnail = QLabel()
+        thumbnail.setFixedSize(THUMBNAIL_WIDTH, THUMBNAIL_WIDTH * 9 // 16)
+        thumbnail.setAlignment(Qt.AlignCenter)
+        thumbnail.setStyleSheet("background-color: #111; border-radius: 4px;")
+        if item.get("thumbnail"):
+            pixmap = QPixmap()
+            pixmap.loadFromData(base64.b64decode(item["thumbnail"]), "JPEG")
+            thumbnail.setPixmap(pixmap)
+        layout.addWidget(thumbnail)
+
+        progress = QProgressBar()
+        progress.setFixedHeight(4)
+        progress.setTextVisible(False)
+        progress.setRange(0, 1000)
+        if item.get("duration"):
+            progress.setValue(int(self.position / item["duration"] * 1000))
+        progress.setStyleSheet("""
+            QProgressBar { background-color: #444; border: none; border-radius: 2px; }
+            QProgressBar::chunk { background-color: #00aaff; border-radius: 2px; }
+        """)
+        layout.addWidget(progress)
+
+        title = QLabel()
+        title.setStyleSheet("font-size: 13px; color: #ddd; background: transparent;")
+        title.setText(title.fontMetrics().elidedText(item["title"], Qt.ElideMiddle, THUMBNAIL_WIDTH))
+        layout.addWidget(title)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.clicked.emit(self.path, self.position)
+        super().mousePressEvent(event)
+
+
+class ContinueWatchingRow(QWidget):
+    item_clicked = pyqtSignal(str, float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        heading = QLabel("Continue watching")
+        heading.setStyleSheet("font-size: 18px; color: #aaa;")
+        layout.addWidget(heading)
+
+        self.tiles_layout = QHBoxLayout()
+        self.tiles_layout.setAlignment(Qt.AlignLeft)
+        self.tiles_layout.setSpacing(12)
+        layout.addLayout(self.tiles_layout)
+
+    def set_items(self, items):
+        while self.tiles_layout.count():
+            self.tiles_layout.takeAt(0).widget().deleteLater()
+        for item in items[:MAX_HOME_TILES]:
+            tile = HistoryTile(item)
+            tile.clicked.connect(self.item_clicked)
+            self.tiles_layout.addWidget(tile)
+        self.setVisible(bool(items))
+
+
+class HomeScreen(QWidget): 
+    stream_server_changed = pyqtSignal(object, object, str)  # StreamServer or None, its config, status text
+
+    def __init__(self, mpv_options=None, settings=None, history=None):
         super().__init__()
+        self.settings = settings or SettingsStore()
         self.setWindowFlags(Qt.FramelessWindowHint)
         self.setWindowTitle("Klydio")
         self.setGeometry(100, 100, 1280, 720)
         self.setStyleSheet("background-color: #1e1e1e; color: white;")
+        self.setAcceptDrops(True)
+        self.mpv_options = mpv_options
+        self.vlc_player = None  # created after the first paint, see create_player
+        self._painted = False
+        self.history = history or WatchHistory()
+        self.scanner = None
         self.sidebar_expanded = False
         self.selected_button = None
 
@@ -548,7 +3331,8 @@ class HomeScreen(QWidget):
         menu_items = [
             ("icons/home.png", "Home"),
             ("icons/video.png", "Video"),
-            ("icons/music.png", "Music")
+            ("icons/music.png", "Music"),
+            ("icons/maximize.svg", "Wall")
         ]
 
         for icon_path, label in menu_items:
@@ -713,6 +3497,11 @@ class HomeScreen(QWidget):
         open_button.clicked.connect(self.open_files)
         self.content_layout.addWidget(open_button)
 
+        self.content_layout.addSpacing(30)
+        self.continue_row = ContinueWatchingRow()  # filled by select_menu
+        self.continue_row.item_clicked.connect(self.resume)
+        self.content_layout.addWidget(self.continue_row)
+
 
         # Finally add to pages
         self.pages.addWidget(home_page_container)
@@ -721,11 +3510,34 @@ class HomeScreen(QWidget):
 
         # Placeholder pages for others
         for _, _, label in self.menu_buttons:
-            if label == "Player":
-                self.vlc_player = MPVPlayer()
-                self.pages.addWidget(self.vlc_player)
-                self.page_widgets[label] = self.vlc_player
-            elif label != "Home":
+            if label == "Wall":
+                page = QWidget()
+                layout = QVBoxLayout(page)
+                layout.setContentsMargins(0, 0, 0, 0)
+                wall_options = mpv_options_from_settings(self.settings)
+                wall_options.pop("vd_lavc_threads")  # the scheduler owns thread counts
+                wall_options.update(mpv_options or {})
+                self.video_wall = VideoWall(wall_options, self.settings.get("wall.thread_budget"))
+                self.settings.changed.connect(self.on_wall_setting_changed)
+                layout.addWidget(self.video_wall)
+
+                footer = self.create_footer(label, "icons/maximize.svg")
+                layout.addWidget(footer)
+
+                self.pages.addWidget(page)
+                self.page_widgets[label] = page
+            elif label == "Settings":
+                page = QWidget()
+                layout = QVBoxLayout(page)
+                self.settings_page = SettingsPage(self.settings)
+                layout.addWidget(self.settings_page)
+
+                footer = self.create_footer(label, f"icons/{label.lower()}.png")
+                layout.addWidget(footer)
+
+                self.pages.addWidget(page)
+                self.page_widgets[label] = page
+            elif label not in ("Home", "Player"):
                 # keep the existing placeholder for other pages
                 page = QWidget()
                 layout = QVBoxLayout(page)
@@ -748,6 +3560,29 @@ class HomeScreen(QWidget):
 
         main_layout.addLayout(self.pages)
 
+        self.exports = ExportQueue(self.settings.get("export.dir"), self.settings.get("export.max_jobs"), parent=self)
+        self.exports.job_added.connect(self.update_export_status)
+        self.exports.job_progress.connect(self.update_export_status)
+        self.exports.job_finished.connect(self.on_export_finished)
+        self.settings.changed.connect(self.on_export_setting_changed)
+
+        self.stream_server = None
+        self.stream_server_config = None  # (root, host, port) the running server listens with
+        self._server_busy = False
+        self._server_pending = False
+        self.stream_server_changed.connect(self.on_stream_server_changed)
+        self.settings.changed.connect(self.on_server_setting_changed)
+        self.update_stream_server()
+
+        self.subtitle_index = SubtitleIndex()
+        self.subtitle_indexer = SubtitleIndexer(self.subtitle_index, parent=self)
+        self.subtitle_panel = None
+
+        self.scenes = SceneAnalyzer(position_source=lambda: self.vlc_player.current_time, parent=self)
+
+        self.keymap = Keymap(load_keymap(self.settings.get("keymap")))
+        self.bind_keys()
+
         # Set default selected page
         if self.menu_buttons:
             self.select_menu(self.menu_buttons[0][0])
@@ -767,16 +3602,242 @@ class HomeScreen(QWidget):
         btn.setStyleSheet(self.get_button_style(self.sidebar_expanded, selected=False))
         return btn
     
-    def eventFilter(self, obj, event):
-        if event.type() == QEvent.KeyPress:
-            key = event.key()
-            if key == Qt.Key_F:
-                self.toggle_fullscreen()
-                return True
-            elif key == Qt.Key_Escape and getattr(self, 'is_fullscreen', False):
-                self.exit_fullscreen()
-                return True
-        return super().eventFilter(obj, event)
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            QTimer.singleShot(0, self.create_player)
+
+    def create_player(self):
+        # Starting mpv costs more than the whole Home page, so it waits for the first paint
+        if self.vlc_player is not None:
+            return self.vlc_player
+        with TRACE.span("create player"):
+            options = mpv_options_from_settings(self.settings)
+            options.update(self.mpv_options or {})
+            self.vlc_player = MPVPlayer(mpv_options=options)
+            self.settings.changed.connect(self.vlc_player.apply_setting)
+            self.pages.addWidget(self.vlc_player)
+            self.page_widgets["Player"] = self.vlc_player
+
+            self.vlc_player.playback_state_changed.connect(self.exports.set_playback_active)
+            self.vlc_player.file_changed.connect(self.subtitle_indexer.enqueue)
+            self.subtitle_panel = SubtitleSearchPanel(self.subtitle_index, self.vlc_player)
+            self.vlc_player.attach_search_panel(self.subtitle_panel)
+            self.subtitle_indexer.file_indexed.connect(lambda path, count: self.subtitle_panel.refresh(path))
+
+            self.scenes.cuts_changed.connect(self.vlc_player.set_scene_cuts)
+            self.vlc_player.duration_changed.connect(self.on_player_duration)
+            self.settings.changed.connect(self.on_scene_setting_changed)
+            self.vlc_player.playback_state_changed.connect(self.scenes.set_playback_active)
+
+            self.vlc_player.file_left.connect(self.on_file_left)
+            self.vlc_player.thumbnail_captured.connect(self.on_thumbnail_captured)
+            self.vlc_player.playback_state_changed.connect(self.on_playback_state_changed)
+            self.bind_player_keys()
+
+            player = self.vlc_player
+            MEMORY.add_gauge("mpv demuxer cache KiB", lambda: demuxer_cache_kib(player.mpv))
+            MEMORY.add_gauge("fade_anim.finished receivers",
+                             lambda: player.fade_anim.receivers(player.fade_anim.finished))
+        return self.vlc_player
+
+    def bind_keys(self):
+        self.keymap.bind("toggle_fullscreen", self, self.toggle_fullscreen, auto_repeat=False)
+        self.keymap.bind("exit_fullscreen", self, self.exit_fullscreen, auto_repeat=False)
+        self.set_exit_keys_enabled(False)  # only claim Escape while fullscreen
+        if TRACE.enabled:
+            self.keymap.bind("dump_trace", self, TRACE.dump, auto_repeat=False)
+        if MEMORY.enabled:
+            self.keymap.bind("memory_report", self, lambda: MEMORY.report(requested=True), auto_repeat=False)
+            MEMORY.reported.connect(self.on_memory_reported)
+        self.keymap.bind("cancel_exports", self, self.exports.cancel_all, auto_repeat=False)
+
+    def on_memory_reported(self, summary, requested):
+        if requested:
+            self.top_bar.show_status(summary, 8000)
+
+    def bind_player_keys(self):
+        self.vlc_player.bind_keys(self.keymap)
+        player, context = self.vlc_player, Qt.WidgetWithChildrenShortcut
+        self.keymap.bind("mark_in", player, self.mark_in, context, auto_repeat=False)
+        self.keymap.bind("mark_out", player, self.mark_out, context, auto_repeat=False)
+        self.keymap.bind("export_clip", player, lambda: self.export_range("clip"), context, auto_repeat=False)
+        self.keymap.bind("export_gif", player, lambda: self.export_range("gif"), context, auto_repeat=False)
+        self.keymap.bind("screenshot", player, self.export_screenshot, context, auto_repeat=False)
+        self.keymap.bind("subtitle_search", player, self.subtitle_panel.toggle, context, auto_repeat=False)
+
+    def mark_in(self):
+        position = self.vlc_player.set_mark_in()
+        if position is not None:
+            self.top_bar.show_status(f"In {format_time(position)}", 3000)
+
+    def mark_out(self):
+        position = self.vlc_player.set_mark_out()
+        if position is not None:
+            self.top_bar.show_status(f"Out {format_time(position)}", 3000)
+
+    def export_range(self, kind):
+        player = self.vlc_player
+        if not player.playing or not player.current_file:
+            return
+        start, end = player.export_range()
+        if end > start:
+            self.exports.add(kind, player.current_file, start, end)
+
+    def export_screenshot(self):
+        player = self.vlc_player
+        if player.playing and player.current_file:
+            self.exports.add("screenshot", player.current_file, player.current_time)
+
+    def update_export_status(self, *args):
+        running = self.exports.running()
+        if not running:
+            return
+        fraction = sum(job["progress"] for job in running) / len(running)
+        queued = sum(1 for job in self.exports.jobs.values() if job["state"] == "queued")
+        text = f"Exporting {len(running)}" + (f" (+{queued} queued)" if queued else "") + f" · {fraction:.0%}"
+        elapsed = max(time.monotonic() - job["started_at"] for job in running)
+        if fraction > 0:
+            text += f" · ETA {format_time(elapsed * (1 - fraction) / fraction)}"
+        self.top_bar.show_status(text)
+
+    def on_export_finished(self, job_id, state):
+        job = self.exports.jobs[job_id]
+        if self.exports.running():
+            self.update_export_status()
+        elif state == "done":
+            self.top_bar.show_status(f"Saved {os.path.basename(job['output'])}", 5000)
+        elif job.get("error"):
+            self.top_bar.show_status(f"Export {state}: {job['error']}", 5000)
+        else:
+            self.top_bar.show_status(f"Export {state}", 5000)
+
+    def resume(self, path, position):
+        if "://" not in path and not os.path.exists(path):
+            self.history.forget(path)
+            self.continue_row.set_items(self.history.items)
+            self.top_bar.show_status(f"File not found: {os.path.basename(path)}", 4000)
+            return
+        self.select_menu(self.player_button)
+        self.vlc_player.play_file(path, start=position)
+
+    def on_file_left(self, path, position, duration):
+        self.history.record(path, position, duration)
+
+    def on_thumbnail_captured(self, path, thumbnail):
+        self.history.set_thumbnail(path, thumbnail)
+
+    def on_playback_state_changed(self, playing):
+        if not playing:
+            self.remember_playback()
+
+    def remember_playback(self, thumbnail=None):
+        # Position only; thumbnails are captured on file switch and at shutdown
+        player = self.vlc_player
+        if player is not None and player.playing and player.current_file:
+            self.history.record(player.current_file, player.current_time, player.total_time, thumbnail)
+
+    def save_history(self):
+        if self.vlc_player is not None:
+            self.remember_playback(self.vlc_player.capture_thumbnail())
+        self.history.save()
+
+    def on_player_duration(self, path, duration):
+        if self.settings.get("scenes.enabled") and "://" not in path:
+            self.scenes.analyze(path, duration)
+
+    def on_scene_setting_changed(self, key, value):
+        if key != "scenes.enabled" or self.vlc_player is None:
+            return
+        player = self.vlc_player
+        if not value:
+            self.scenes.cancel()
+            player.set_scene_cuts(player.current_file, [])
+        elif player.playing and player.current_file and player.total_time > 0:
+            self.on_player_duration(player.current_file, player.total_time)
+
+    def on_server_setting_changed(self, key, value):
+        if key == "server.max_streams" and self.stream_server is not None:
+            self.stream_server.max_streams = value  # no restart needed
+        elif key.startswith("server."):
+            self.update_stream_server()
+
+    def update_stream_server(self):
+        # Stopping and starting the server can take seconds, so it happens on a worker
+        # thread, and only when something the listening socket depends on has changed
+        if self._server_busy:
+            self._server_pending = True  # re-evaluated once the current change lands
+            return
+
+        root = self.settings.get("server.root")
+        wanted, status = None, ""
+        if self.settings.get("server.enabled"):
+            if root:
+                wanted = (os.path.realpath(root), self.settings.get("server.host"), self.settings.get("server.port"))
+            else:
+                status = "Choose a folder to share"
+        if wanted == self.stream_server_config:
+            if wanted is None:
+                self.settings_page.server_status.setText(status)
+            return
+
+        current, self.stream_server = self.stream_server, None
+        self._server_busy = True
+        self.settings_page.server_status.setText("Starting server..." if wanted else status)
+
+        def restart():
+            if current is not None:
+                current.stop()
+            server, text = None, status
+            if wanted is not None:
+                server = StreamServer(*wanted, max_streams=self.settings.get("server.max_streams"))
+                try:
+                    server.start()
+                    text = f"Serving at {server.url()}"
+                except OSError as e:
+                    server, text = None, f"Could not start server: {e}"
+            self.stream_server_changed.emit(server, wanted if server else None, text)
+
+        threading.Thread(target=restart, name="stream-server-control", daemon=True).start()
+
+    def on_stream_server_changed(self, server, config, status):
+        self.stream_server = server
+        self.stream_server_config = config
+        self._server_busy = False
+        if server is not None:
+            server.max_streams = self.settings.get("server.max_streams")  # may have moved meanwhile
+        self.settings_page.server_status.setText(status)
+        if self._server_pending:
+            self._server_pending = False
+            self.update_stream_server()
+
+    def stop_stream_server(self):
+        if self.stream_server is not None:
+            self.stream_server.stop()
+
+    def on_export_setting_changed(self, key, value):
+        if key == "export.dir":
+            self.exports.output_dir = value
+        elif key == "export.max_jobs":
+            self.exports.set_max_jobs(value)
+
+    def on_wall_setting_changed(self, key, value):
+        if key == "wall.thread_budget":
+            self.video_wall.scheduler.set_thread_budget(value)
+        else:
+            for tile in self.video_wall.tiles:
+                tile.apply_setting(key, value)
+
+    def changeEvent(self, event):
+        # Minimising doesn't hide child widgets, so tell the wall scheduler directly
+        if event.type() == QEvent.WindowStateChange and hasattr(self, "video_wall"):
+            self.video_wall.scheduler.schedule()
+        super().changeEvent(event)
+
+    def set_exit_keys_enabled(self, enabled):
+        for shortcut in self.keymap.shortcuts.get("exit_fullscreen", []):
+            shortcut.setEnabled(enabled)
 
     def toggle_fullscreen(self):
         if not hasattr(self, 'is_fullscreen'):
@@ -788,8 +3849,10 @@ class HomeScreen(QWidget):
             self.top_bar.hide()
             self.sidebar_frame.hide()
             self.pages.setContentsMargins(0, 0, 0, 0)
-            self.vlc_player.wrapper.layout().setContentsMargins(0, 0, 0, 0)
+            if self.vlc_player is not None:
+                self.vlc_player.wrapper.layout().setContentsMargins(0, 0, 0, 0)
             self.is_fullscreen = True
+            self.set_exit_keys_enabled(True)
         else:
             self.exit_fullscreen()
 
@@ -797,8 +3860,10 @@ class HomeScreen(QWidget):
         self.top_bar.show()
         self.sidebar_frame.show()
         self.pages.setContentsMargins(0, 0, 0, 0)
-        self.vlc_player.wrapper.layout().setContentsMargins(0, 0, 0, 0)
+        if self.vlc_player is not None:
+            self.vlc_player.wrapper.layout().setContentsMargins(0, 0, 0, 0)
         self.is_fullscreen = False
+        self.set_exit_keys_enabled(False)
 
 
 
@@ -855,31 +3920,42 @@ class HomeScreen(QWidget):
         """
 
     def select_menu(self, button):
-        if self.selected_button:
-            self.selected_button.setStyleSheet(
-                self.get_button_style(self.sidebar_expanded, selected=False)
-            )
-        self.selected_button = button
-        button.setStyleSheet(
-            self.get_button_style(self.sidebar_expanded, selected=True)
-        )
+        with TRACE.span("page switch", "page"):
+            with TRACE.span("style refresh"):
+                if self.selected_button:
+                    self.selected_button.setStyleSheet(
+                        self.get_button_style(self.sidebar_expanded, selected=False)
+                    )
+                self.selected_button = button
+                button.setStyleSheet(
+                    self.get_button_style(self.sidebar_expanded, selected=True)
+                )
+
+            label = button.toolTip()
+            if label == "Player":
+                self.create_player()
+            elif label == "Home":
+                self.remember_playback()
+                self.continue_row.set_items(self.history.items)
+            if label in self.page_widgets:
+                widget = self.page_widgets[label]
+                index = self.pages.indexOf(widget)
+                self.pages.setCurrentIndex(index)
 
-        label = button.toolTip()
-        if label in self.page_widgets:
-            widget = self.page_widgets[label]
-            index = self.pages.indexOf(widget)
-            self.pages.setCurrentIndex(index)
-
-            # Activate/deactivate MPVPlayer mouse logic
-            if isinstance(widget, MPVPlayer):
-                widget.set_active(True)
-            else:
-                self.vlc_player.set_active(False)
+                # Activate/deactivate MPVPlayer mouse logic
+                if isinstance(widget, MPVPlayer):
+                    widget.set_active(True)
+                elif self.vlc_player is not None:
+                    self.vlc_player.set_active(False)
 
 
 
 
     def toggle_sidebar(self):
+        with TRACE.span("toggle sidebar"):
+            self._toggle_sidebar()
+
+    def _toggle_sidebar(self):
         self.sidebar_expanded = not self.sidebar_expanded
         new_width = 300 if self.sidebar_expanded else 60
 
@@ -893,26 +3969,78 @@ class HomeScreen(QWidget):
 
         self.toggle_button.setText("     Menu" if self.sidebar_expanded else "")
         self.bottom_button.setText("     Settings" if self.sidebar_expanded else "")
-        self.bottom_button.setStyleSheet(
-            self.get_button_style(self.sidebar_expanded, selected=False)
-        )
-        self.toggle_button.setStyleSheet(
-            self.get_button_style(self.sidebar_expanded, selected=False)
-        )
-
-        for btn, _, label in self.menu_buttons:
-            btn.setText(f"     {label}" if self.sidebar_expanded else "")
-            btn.setToolTip(label)
-            is_selected = btn == self.selected_button
-            btn.setStyleSheet(
-                self.get_button_style(self.sidebar_expanded, selected=is_selected)
+        with TRACE.span("style refresh"):
+            self.bottom_button.setStyleSheet(
+                self.get_button_style(self.sidebar_expanded, selected=False)
             )
+            self.toggle_button.setStyleSheet(
+                self.get_button_style(self.sidebar_expanded, selected=False)
+            )
+
+            for btn, _, label in self.menu_buttons:
+                btn.setText(f"     {label}" if self.sidebar_expanded else "")
+                btn.setToolTip(label)
+                is_selected = btn == self.selected_button
+                btn.setStyleSheet(
+                    self.get_button_style(self.sidebar_expanded, selected=is_selected)
+                )
 
     def open_files(self):
-        files, _ = QFileDialog.getOpenFileNames(self, "Open Video Files", "", "Video Files (*.mp4 *.avi *.mkv *.mov)")
+        files, _ = QFileDialog.getOpenFileNames(
+            self, "Open Video Files", "",
+            "Video Files (*.mp4 *.avi *.mkv *.mov *.webm *.m4v *.ts);;Playlists (*.m3u *.m3u8);;All Files (*)"
+        )
         if files:
+            self.open_paths(files)
+
+    def open_paths(self, paths):
+        # Files, folders, .m3u playlists and URLs; folders are walked in the background
+        if self.scanner is not None:
+            self.scanner.batch_found.disconnect()
+            self.scanner.stop()
+        self.queue_started = False
+        self.scanner = MediaScanner(paths, parent=self)
+        self.scanner.batch_found.connect(self.on_media_found)
+        self.scanner.finished.connect(self.on_scan_finished)
+        self.scanner.start()
+
+    def on_media_found(self, batch):
+        if not self.queue_started:
+            self.queue_started = True
             self.select_menu(self.player_button)  # Navigate to Player tab
-            self.vlc_player.play_file(files[0])  # Play the first selected file
+            self.vlc_player.enqueue(batch, replace=True)
+        else:
+            self.vlc_player.enqueue(batch)
+        if self.scanner is not None and self.scanner.isRunning():
+            self.top_bar.show_status(f"Adding files... {self.scanner.found}")
+
+    def stop_scanners(self):
+        # Superseded scanners may still be winding down; none may outlive the window
+        for scanner in self.findChildren(MediaScanner):
+            scanner.stop()
+            scanner.wait()
+
+    def on_scan_finished(self):
+        scanner = self.sender()
+        if scanner is not self.scanner:
+            scanner.deleteLater()  # superseded by a newer drop
+            return
+        if scanner.found:
+            self.top_bar.show_status(f"Queued {scanner.found} file(s)", 4000)
+        else:
+            self.top_bar.show_status("No playable files found", 4000)
+        self.scanner = None
+        scanner.deleteLater()
+
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event):
+        paths = [url.toLocalFile() if url.isLocalFile() else url.toString() for url in event.mimeData().urls()]
+        if paths:
+            event.acceptProposedAction()
+            self.open_paths(paths)
 
 
 
@@ -930,7 +4058,18 @@ class HomeScreen(QWidget):
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
+    TRACE.start()
+    MEMORY.start()
+    app.aboutToQuit.connect(TRACE.stop)
+    app.aboutToQuit.connect(MEMORY.stop)
     window = HomeScreen()
+    app.aboutToQuit.connect(window.settings.flush)
+    app.aboutToQuit.connect(window.exports.shutdown)
+    app.aboutToQuit.connect(window.stop_stream_server)
+    app.aboutToQuit.connect(window.scenes.cancel)
+    app.aboutToQuit.connect(window.save_history)
+    app.aboutToQuit.connect(window.stop_scanners)
     window.show()
-    app.installEventFilter(window)
+    if len(app.arguments()) > 1:
+        window.open_paths(app.arguments()[1:])
     sys.exit(app.exec_())
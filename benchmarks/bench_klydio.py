@@ -0,0 +1,174 @@
+"""Headless benchmarks for Klydio.
+
+    python benchmarks/bench_klydio.py                    # run and compare to baseline.json
+    python benchmarks/bench_klydio.py --update-baseline  # record a new baseline
+
+Runs with QT_QPA_PLATFORM=offscreen and mpv using vo=null/ao=null. Test media is
+generated into benchmarks/media/ from lavfi sources on first run. Exits non-zero
+when a metric regresses beyond --tolerance relative to the baseline.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+from common import (
+    NULL_OUTPUT, make_app, pump, wait_until, MpvEventWaiter, median, isolated_settings, isolated_history,
+    shutdown_window, load_json, save_json, compare_to_baseline,
+)
+from media import generate_media
+
+from PyQt5.QtCore import QTimer
+
+import Klydio
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def bench_startup(app, repeats):
+    construct, first_show, player_ready = [], [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        window = Klydio.HomeScreen(mpv_options=NULL_OUTPUT, settings=isolated_settings(), history=isolated_history())
+        built = time.perf_counter()
+        window.show()
+        app.processEvents()
+        shown = time.perf_counter()
+        # mpv is started only after the first paint
+        wait_until(app, lambda: window.vlc_player is not None, what="player creation")
+        ready = time.perf_counter()
+
+        construct.append((built - start) * 1000)
+        first_show.append((shown - built) * 1000)
+        player_ready.append((ready - built) * 1000)
+        shutdown_window(app, window)
+    return {
+        "startup.home_screen_ms": median(construct),
+        "startup.first_show_ms": median(first_show),
+        "startup.player_ready_ms": median(player_ready),
+    }
+
+
+def bench_playback(app, window, media, seeks):
+    player = window.vlc_player
+    loaded = MpvEventWaiter(player.mpv, "file-loaded")
+    restarted = MpvEventWaiter(player.mpv, "playback-restart")
+    rng = random.Random(1234)  # same seek targets on every run
+    metrics = {}
+
+    for name, path in media.items():
+        count, restarts = loaded.count, restarted.count
+        start = time.perf_counter()
+        player.play_file(path)
+        loaded.wait_past(app, count, what=f"{name} to load")
+        metrics[f"load.{name}_ms"] = (time.perf_counter() - start) * 1000
+
+        wait_until(app, lambda: player.total_time > 0, what=f"{name} duration")
+        # The first restart after loading is the initial playback start, not a seek
+        restarted.wait_past(app, restarts, what=f"{name} to start")
+
+        samples = []
+        for _ in range(seeks):
+            count = restarted.count
+            start = time.perf_counter()
+            player.set_position(rng.randint(50, 950))
+            restarted.wait_past(app, count, what=f"{name} seek")
+            samples.append((time.perf_counter() - start) * 1000)
+        metrics[f"seek.{name}_ms"] = median(samples)
+    return metrics
+
+
+def bench_sidebar(app, window, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        window.toggle_sidebar()
+        app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+        pump(app, 0.12)  # let the 100 ms width animation finish before the next toggle
+    return {"ui.sidebar_toggle_ms": median(samples)}
+
+
+def bench_event_throughput(app, window, path, seconds):
+    # How often a zero-interval timer gets serviced while mpv streams time-pos updates
+    player = window.vlc_player
+    player.play_file(path)
+    wait_until(app, lambda: player.playing and player.total_time > 0, what="throughput clip")
+
+    ticks = 0
+
+    def tick():
+        nonlocal ticks
+        ticks += 1
+
+    timer = QTimer()
+    timer.setInterval(0)
+    timer.timeout.connect(tick)
+    timer.start()
+    start = time.perf_counter()
+    pump(app, seconds)
+    elapsed = time.perf_counter() - start
+    timer.stop()
+    return {"ui.event_throughput_hz": ticks / elapsed}
+
+
+def run(args):
+    app = make_app()
+    media = generate_media(duration=args.duration)
+    if not media:
+        sys.exit("No test media could be generated")
+
+    metrics = bench_startup(app, args.repeats)
+
+    window = Klydio.HomeScreen(mpv_options=NULL_OUTPUT, settings=isolated_settings(), history=isolated_history())
+    window.show()
+    app.processEvents()
+    try:
+        metrics.update(bench_sidebar(app, window, args.repeats * 2))
+        window.select_menu(window.player_button)
+        metrics.update(bench_playback(app, window, media, args.seeks))
+        metrics.update(bench_event_throughput(app, window, next(iter(media.values())), args.throughput_seconds))
+    finally:
+        shutdown_window(app, window)
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seeks", type=int, default=10)
+    parser.add_argument("--duration", type=int, default=20, help="length of generated clips in seconds")
+    parser.add_argument("--throughput-seconds", type=float, default=3.0)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", help="also write this run's metrics to a JSON file")
+    args = parser.parse_args()
+
+    metrics = run(args)
+    for name in sorted(metrics):
+        print(f"{name:40s} {metrics[name]:10.2f}")
+
+    result = {"metrics": metrics, "platform": sys.platform, "recorded": time.strftime("%Y-%m-%d %H:%M:%S")}
+    if args.output:
+        save_json(args.output, result)
+    if args.update_baseline:
+        save_json(args.baseline, result)
+        print(f"Baseline written: {args.baseline}")
+        return
+
+    baseline = load_json(args.baseline)
+    if baseline is None:
+        print("No baseline yet; run with --update-baseline to record one")
+        return
+
+    regressions = compare_to_baseline(metrics, baseline, args.tolerance)
+    for name, base, current in regressions:
+        print(f"REGRESSION {name}: {base:.2f} -> {current:.2f}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Video wall benchmark: CPU and dropped frames for a 3x3 wall, with and without
+the decode scheduler.
+
+    python benchmarks/bench_wall.py
+    python benchmarks/bench_wall.py --vo gpu --clip h264_1080p   # on a real display
+
+CPU is process CPU time (mpv decodes in-process) divided by wall-clock time, so
+100% means one core fully busy. Dropped frames are mpv's frame-drop-count plus
+decoder-frame-drop-count summed over all tiles. With the default vo=null nothing
+is presented, so only decoder drops are meaningful; use a real --vo on a display
+for frame-drop numbers worth comparing. Decoder threads is the total the
+scheduler handed out: one per background tile plus the rest of --thread-budget
+for the focused tile. Every on-screen tile keeps playing.
+"""
+import os
+import sys
+import time
+import argparse
+import resource
+
+from common import NULL_OUTPUT, make_app, pump, wait_until, save_json
+from media import generate_media
+
+import Klydio
+
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def dropped_frames(tiles):
+    total = 0
+    for tile in tiles:
+        for prop in ("frame_drop_count", "decoder_frame_drop_count"):
+            total += getattr(tile.mpv, prop, None) or 0
+    return total
+
+
+def run_wall(app, path, tiles, seconds, scheduler_enabled, mpv_options, thread_budget):
+    wall = Klydio.VideoWall(mpv_options=mpv_options, thread_budget=thread_budget)
+    wall.scheduler.enabled = scheduler_enabled
+    wall.resize(1280, 720)
+    wall.show()
+    wall.set_clips([path] * tiles)
+    try:
+        wait_until(app, lambda: all(t.is_loaded for t in wall.tiles), timeout=30, what="wall tiles to load")
+        pump(app, 2.0)  # settle: decoders reinitialised, caches warm
+
+        drops_before = dropped_frames(wall.tiles)
+        cpu_before, start = cpu_seconds(), time.perf_counter()
+        pump(app, seconds)
+        elapsed = time.perf_counter() - start
+        return {
+            "cpu_percent": (cpu_seconds() - cpu_before) / elapsed * 100,
+            "dropped_frames": dropped_frames(wall.tiles) - drops_before,
+            # Unscheduled tiles leave the thread count to mpv (0 = auto per tile)
+            "decoder_threads": sum(t.threads for t in wall.tiles if t.tier in ("focused", "background"))
+                               if scheduler_enabled else None,
+            "playing_tiles": sum(1 for t in wall.tiles if not t.mpv.pause),
+        }
+    finally:
+        wall.clear()
+        wall.close()
+        app.processEvents()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clip", default="h264_1080p", help="name of a generated clip from media.py")
+    parser.add_argument("--tiles", type=int, default=9)
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--vo", default="null", help="mpv video output; null keeps it headless")
+    parser.add_argument("--thread-budget", type=int, default=0, help="wall.thread_budget; 0 = core count")
+    parser.add_argument("--output", help="write results to a JSON file")
+    args = parser.parse_args()
+
+    app = make_app()
+    media = generate_media()
+    if args.clip not in media:
+        sys.exit(f"Clip {args.clip} unavailable; have: {', '.join(media) or 'none'}")
+
+    mpv_options = dict(NULL_OUTPUT, vo=args.vo)
+    results = {}
+    for label, enabled in (("unscheduled", False), ("scheduled", True)):
+        results[label] = run_wall(app, media[args.clip], args.tiles, args.seconds, enabled, mpv_options,
+                                  args.thread_budget)
+        print(f"{label:12s} cpu {results[label]['cpu_percent']:7.1f}%   "
+              f"dropped frames {results[label]['dropped_frames']}   "
+              f"decoder threads {results[label]['decoder_threads'] or 'auto'}   "
+              f"playing tiles {results[label]['playing_tiles']}")
+    if args.vo == "null":
+        print("note: vo=null presents no frames, so dropped frames only count decoder drops")
+
+    if args.output:
+        save_json(args.output, {"clip": args.clip, "tiles": args.tiles, "cores": os.cpu_count(), "vo": args.vo,
+                                "thread_budget": args.thread_budget, "results": results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Headless by default; must be set before QApplication is created
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # Klydio loads its icons relative to the working directory
+
+from PyQt5.QtCore import QEventLoop
+from PyQt5.QtWidgets import QApplication
+
+NULL_OUTPUT = {"vo": "null", "ao": "null"}
+
+
+def make_app():
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    app.setStyle("Fusion")
+    return app
+
+
+def pump(app, seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        app.processEvents(QEventLoop.AllEvents, 5)
+        time.sleep(0.001)
+
+
+def wait_until(app, predicate, timeout=10.0, what="condition"):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"Timed out waiting for {what}")
+        app.processEvents(QEventLoop.AllEvents, 5)
+        time.sleep(0.0005)
+
+
+class MpvEventWaiter:
+    # Counts mpv events delivered on mpv's event thread so the GUI thread can wait on them
+    def __init__(self, mpv, event_name):
+        self.count = 0
+        self._cond = threading.Condition()
+        mpv.event_callback(event_name)(self._on_event)
+
+    def _on_event(self, event):
+        with self._cond:
+            self.count += 1
+            self._cond.notify_all()
+
+    def wait_past(self, app, count, timeout=10.0, what="mpv event"):
+        wait_until(app, lambda: self.count > count, timeout, what)
+
+
+def isolated_settings():
+    # Keep the user's ~/.klydio/settings.json (profiles, cache sizes) out of the numbers
+    import Klydio
+    directory = tempfile.mkdtemp(prefix="klydio-bench-")
+    return Klydio.SettingsStore(path=os.path.join(directory, "settings.json"))
+
+
+def isolated_history():
+    # An empty Home page snapshot, so startup numbers don't depend on what was watched
+    import Klydio
+    directory = tempfile.mkdtemp(prefix="klydio-bench-")
+    return Klydio.WatchHistory(path=os.path.join(directory, "home.json"))
+
+
+def median(values):
+    return statistics.median(values) if values else None
+
+
+def shutdown_window(app, window):
+    player = getattr(window, "vlc_player", None)
+    if player is not None:
+        player.mpv.terminate()
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+
+
+def load_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def compare_to_baseline(metrics, baseline, tolerance, slack_ms=2.0):
+    # Returns (name, baseline, current) for every metric that regressed beyond tolerance.
+    # Metrics ending in _hz or _per_s are higher-is-better, everything else is a duration.
+    regressions = []
+    for name, base in baseline.get("metrics", {}).items():
+        current = metrics.get(name)
+        if current is None or base is None:
+            continue
+        if name.endswith(("_hz", "_per_s")):
+            regressed = current < base * (1 - tolerance)
+        else:
+            regressed = current > base * (1 + tolerance) + slack_ms
+        if regressed:
+            regressions.append((name, base, current))
+    return regressions
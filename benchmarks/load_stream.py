@@ -0,0 +1,136 @@
+"""Load test for the LAN streaming server.
+
+    python benchmarks/load_stream.py --clients 50 --seconds 20
+
+Starts a StreamServer on localhost over a generated file and runs N concurrent
+keep-alive clients issuing random Range requests, like players seeking around.
+Reports aggregate throughput and time-to-first-byte percentiles.
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+from common import save_json
+
+import Klydio
+
+
+def make_library(size_mib):
+    root = tempfile.mkdtemp(prefix="klydio-stream-")
+    path = os.path.join(root, "clip.mp4")
+    with open(path, "wb") as f:
+        for _ in range(size_mib):
+            f.write(os.urandom(1024 * 1024))
+    return root, "clip.mp4", size_mib * 1024 * 1024
+
+
+async def read_head(reader):
+    status = await reader.readline()
+    if not status:
+        raise ConnectionError("connection closed")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return int(status.split()[1]), headers
+
+
+async def client(port, name, size, chunk, deadline, stats, rng):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < deadline:
+            start = rng.randrange(0, size - chunk)
+            request = (f"GET /media/{name} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                       f"Range: bytes={start}-{start + chunk - 1}\r\n\r\n")
+            sent = time.perf_counter()
+            writer.write(request.encode("latin-1"))
+            await writer.drain()
+
+            status, headers = await read_head(reader)
+            remaining = int(headers.get("content-length", 0))
+            first = True
+            while remaining:
+                data = await reader.read(min(remaining, 256 * 1024))
+                if not data:
+                    raise ConnectionError("short body")
+                if first:
+                    stats["ttfb"].append((time.perf_counter() - sent) * 1000)
+                    first = False
+                remaining -= len(data)
+                stats["bytes"] += len(data)
+
+            if status == 206:
+                stats["requests"] += 1
+            else:
+                stats["errors"] += 1
+                if headers.get("connection") == "close":
+                    break
+    except (ConnectionError, ValueError):
+        stats["errors"] += 1
+    finally:
+        writer.close()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+async def run(args, port, name, size):
+    stats = {"bytes": 0, "requests": 0, "errors": 0, "ttfb": []}
+    rng = random.Random(42)
+    start = time.perf_counter()
+    deadline = start + args.seconds
+    chunk = args.chunk_kib * 1024
+    await asyncio.gather(*(client(port, name, size, chunk, deadline, stats, random.Random(rng.random()))
+                           for _ in range(args.clients)))
+    stats["elapsed"] = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--file-mib", type=int, default=256)
+    parser.add_argument("--chunk-kib", type=int, default=2048, help="size of each ranged request")
+    parser.add_argument("--max-streams", type=int, default=64)
+    parser.add_argument("--output", help="write results to a JSON file")
+    args = parser.parse_args()
+
+    root, name, size = make_library(args.file_mib)
+    server = Klydio.StreamServer(root, host="127.0.0.1", port=0, max_streams=args.max_streams)
+    server.start()
+    try:
+        stats = asyncio.run(run(args, server.port, name, size))
+    finally:
+        server.stop()
+
+    results = {
+        "clients": args.clients,
+        "requests": stats["requests"],
+        "errors": stats["errors"],
+        "throughput_mib_per_s": stats["bytes"] / stats["elapsed"] / (1024 * 1024),
+        "ttfb_p50_ms": percentile(stats["ttfb"], 0.50),
+        "ttfb_p95_ms": percentile(stats["ttfb"], 0.95),
+        "ttfb_p99_ms": percentile(stats["ttfb"], 0.99),
+        "ttfb_mean_ms": statistics.fmean(stats["ttfb"]) if stats["ttfb"] else 0.0,
+    }
+    for key, value in results.items():
+        print(f"{key:24s} {value:10.2f}" if isinstance(value, float) else f"{key:24s} {value:10d}")
+    if args.output:
+        save_json(args.output, results)
+    if stats["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
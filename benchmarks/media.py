@@ -0,0 +1,85 @@
+import os
+import shutil
+import subprocess
+
+# name, video encoder, size, container
+CLIPS = [
+    ("h264_360p", "libx264", "640x360", "mp4"),
+    ("h264_1080p", "libx264", "1920x1080", "mp4"),
+    ("hevc_1080p", "libx265", "1920x1080", "mkv"),
+    ("vp9_720p", "libvpx-vp9", "1280x720", "webm"),
+    ("mpeg4_480p", "mpeg4", "854x480", "avi"),
+]
+
+AUDIO_CODECS = {"mp4": "aac", "mkv": "aac", "webm": "libopus", "avi": "pcm_s16le"}
+
+# Keep encodes fast; the clips only need to be decodable, not pretty
+ENCODER_ARGS = {
+    "libx264": ["-preset", "veryfast"],
+    "libx265": ["-preset", "ultrafast", "-x265-params", "log-level=error"],
+    "libvpx-vp9": ["-deadline", "realtime", "-cpu-used", "8"],
+    "mpeg4": ["-q:v", "5"],
+}
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "media")
+
+
+def _ffmpeg_command(tmp, codec, size, ext, duration, rate):
+    return [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "lavfi", "-i", f"testsrc2=size={size}:rate={rate}:duration={duration}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+        "-c:v", codec, *ENCODER_ARGS.get(codec, []),
+        "-pix_fmt", "yuv420p", "-g", str(rate * 2),
+        "-c:a", AUDIO_CODECS[ext],
+        tmp,
+    ]
+
+
+def _mpv_command(tmp, codec, size, ext, duration, rate):
+    # mpv's encoding mode can read lavfi sources too, for hosts without ffmpeg
+    return [
+        "mpv", "--no-config", "--really-quiet",
+        f"av://lavfi:testsrc2=size={size}:rate={rate}:duration={duration}",
+        f"--o={tmp}", f"--ovc={codec}", "--ovcopts=g=" + str(rate * 2),
+    ]
+
+
+def generate_clip(out_dir, name, codec, size, ext, duration=20, rate=30):
+    path = os.path.join(out_dir, f"{name}.{ext}")
+    if os.path.exists(path):
+        return path
+
+    tmp = os.path.join(out_dir, f"{name}.part.{ext}")
+    if shutil.which("ffmpeg"):
+        cmd = _ffmpeg_command(tmp, codec, size, ext, duration, rate)
+    elif shutil.which("mpv"):
+        cmd = _mpv_command(tmp, codec, size, ext, duration, rate)
+    else:
+        raise RuntimeError("Neither ffmpeg nor mpv is available to generate test media")
+
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0 or not os.path.exists(tmp):
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        reason = (result.stderr.strip().splitlines() or ["encoder failed"])[-1]
+        print(f"Skipping {name}: {reason}")
+        return None
+
+    os.replace(tmp, path)
+    return path
+
+
+def generate_media(out_dir=DEFAULT_DIR, duration=20, clips=CLIPS):
+    os.makedirs(out_dir, exist_ok=True)
+    media = {}
+    for name, codec, size, ext in clips:
+        path = generate_clip(out_dir, name, codec, size, ext, duration=duration)
+        if path:
+            media[name] = path
+    return media
+
+
+if __name__ == "__main__":
+    for name, path in generate_media().items():
+        print(f"{name}: {path}")
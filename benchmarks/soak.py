@@ -0,0 +1,157 @@
+"""Soak test: loops play, seek, pause, page-switch and overlay fade cycles and fails
+when memory keeps growing.
+
+    python benchmarks/soak.py --hours 4
+    python benchmarks/soak.py --minutes 20 --sample-seconds 30   # quick check
+
+RSS is sampled at a fixed interval. After a warm-up (caches filling, fonts and
+icons loaded), a least-squares slope is fitted over all samples and over the
+second half alone; the run fails when both exceed --max-growth-mib-per-hour,
+i.e. memory is still climbing at the end rather than levelling off. With
+--memtrace, Klydio's memory accounting is switched on and the subsystems that
+grew most are printed, so a failure comes with a suspect.
+"""
+import sys
+import time
+import random
+import argparse
+
+from common import (
+    NULL_OUTPUT, make_app, pump, wait_until, MpvEventWaiter, isolated_settings, isolated_history,
+    shutdown_window, save_json,
+)
+from media import generate_media
+
+from PyQt5.QtCore import Qt, QEvent, QPoint
+from PyQt5.QtGui import QMouseEvent
+
+import Klydio
+
+
+def slope_mib_per_hour(samples):
+    # samples: [(seconds, rss_kib)]
+    if len(samples) < 3:
+        return 0.0
+    n = len(samples)
+    mean_t = sum(t for t, _ in samples) / n
+    mean_m = sum(m for _, m in samples) / n
+    var = sum((t - mean_t) ** 2 for t, _ in samples)
+    if not var:
+        return 0.0
+    cov = sum((t - mean_t) * (m - mean_m) for t, m in samples)
+    return cov / var * 3600 / 1024
+
+
+def move_mouse(app, widget):
+    pos = QPoint(widget.width() // 2, widget.height() // 2)
+    event = QMouseEvent(QEvent.MouseMove, pos, Qt.NoButton, Qt.NoButton, Qt.NoModifier)
+    app.sendEvent(widget, event)
+
+
+def run_cycle(app, window, clips, rng, loaded, restarted):
+    player = window.vlc_player
+    path = rng.choice(clips)
+
+    window.select_menu(window.player_button)
+    count, restarts = loaded.count, restarted.count
+    player.play_file(path)
+    loaded.wait_past(app, count, what="clip to load")
+    wait_until(app, lambda: player.total_time > 0, what="duration")
+    restarted.wait_past(app, restarts, what="playback start")
+
+    for _ in range(5):
+        count = restarted.count
+        player.set_position(rng.randint(50, 950))
+        restarted.wait_past(app, count, what="seek")
+
+    # Overlay fade cycle: mouse movement shows it, hiding the cursor fades it out
+    for _ in range(3):
+        move_mouse(app, player.video_frame)
+        player.check_cursor_visibility()
+        pump(app, 0.35)
+        player.hide_cursor()
+        player.check_cursor_visibility()
+        pump(app, 0.35)
+
+    player.toggle_play_pause()
+    pump(app, 0.2)
+    player.toggle_play_pause()
+
+    for button, _, _ in window.menu_buttons:
+        window.select_menu(button)
+        pump(app, 0.05)
+    for logo in window.findChildren(Klydio.SpinningLogo):
+        logo.anim.start()
+    pump(app, 0.6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=0.0)
+    parser.add_argument("--minutes", type=float, default=0.0)
+    parser.add_argument("--sample-seconds", type=float, default=60.0)
+    parser.add_argument("--warmup-minutes", type=float, default=5.0)
+    parser.add_argument("--max-growth-mib-per-hour", type=float, default=4.0)
+    parser.add_argument("--memtrace", action="store_true", help="enable Klydio's memory accounting")
+    parser.add_argument("--output", help="write samples and verdict to a JSON file")
+    args = parser.parse_args()
+
+    duration = args.hours * 3600 + args.minutes * 60 or 3600.0
+    app = make_app()
+    media = generate_media(duration=30)
+    if not media:
+        sys.exit("No test media could be generated")
+    clips = list(media.values())
+
+    if args.memtrace:
+        Klydio.MEMORY.enabled = True
+        Klydio.MEMORY.interval_s = args.sample_seconds
+        Klydio.MEMORY.start()
+
+    window = Klydio.HomeScreen(mpv_options=NULL_OUTPUT, settings=isolated_settings(), history=isolated_history())
+    window.show()
+    app.processEvents()
+    window.create_player()
+    loaded = MpvEventWaiter(window.vlc_player.mpv, "file-loaded")
+    restarted = MpvEventWaiter(window.vlc_player.mpv, "playback-restart")
+
+    rng = random.Random(7)
+    start = time.monotonic()
+    next_sample = start
+    samples, cycles = [], 0
+    try:
+        while time.monotonic() - start < duration:
+            run_cycle(app, window, clips, rng, loaded, restarted)
+            cycles += 1
+            now = time.monotonic()
+            if now >= next_sample:
+                rss = Klydio.current_rss_kib()
+                samples.append((now - start, rss))
+                next_sample = now + args.sample_seconds
+                print(f"{(now - start) / 60:7.1f} min  cycles {cycles:6d}  rss {rss / 1024:8.1f} MiB")
+    finally:
+        Klydio.MEMORY.stop()
+        shutdown_window(app, window)
+
+    measured = [s for s in samples if s[0] >= args.warmup_minutes * 60]
+    overall = slope_mib_per_hour(measured)
+    late = slope_mib_per_hour(measured[len(measured) // 2:])
+    growing = overall > args.max_growth_mib_per_hour and late > args.max_growth_mib_per_hour
+    print(f"cycles {cycles}, growth {overall:+.2f} MiB/h overall, {late:+.2f} MiB/h in the second half")
+
+    if args.output:
+        save_json(args.output, {
+            "cycles": cycles, "samples": samples, "growth_mib_per_hour": overall,
+            "late_growth_mib_per_hour": late, "failed": growing,
+        })
+    if len(measured) < 6:
+        print("Too few samples after warm-up for a verdict; run longer or sample more often")
+        return
+    if growing:
+        print(f"FAIL: memory still growing (limit {args.max_growth_mib_per_hour} MiB/h)")
+        sys.exit(1)
+    print("OK: memory levelled off")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+import Klydio
+
+
+@pytest.fixture(scope="module")
+def app():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+JOB = {"id": "4", "kind": "clip", "source": "/videos/a.mp4", "start": 1.0, "end": 2.0,
+       "output": "/videos/a_00-00-01-00-00-02.mp4", "state": "running"}
+
+
+@pytest.mark.parametrize("content", ["{}", "null", "{broken"])
+def test_unusable_state_file_starts_empty(app, tmp_path, content):
+    path = tmp_path / "exports.json"
+    path.write_text(content)
+    assert Klydio.ExportQueue(state_path=str(path)).jobs == {}
+
+
+def test_interrupted_jobs_are_queued_again(app, tmp_path):
+    path = tmp_path / "exports.json"
+    path.write_text(json.dumps([JOB, [], {"id": "x"}, dict(JOB, id="five")]))
+    queue = Klydio.ExportQueue(state_path=str(path))
+    assert list(queue.jobs) == ["4"]
+    assert queue.jobs["4"]["state"] == "queued"
+    assert queue._next_id == 5
+
+
+def test_decoder_and_encoder_threads_capped_during_playback():
+    cmd = Klydio.export_command(JOB, "out.mp4", playback_active=True)
+    source = cmd.index("-i")
+    assert "-threads" in cmd[:source] and "-threads" in cmd[source:]
+    assert "-threads" not in Klydio.export_command(JOB, "out.mp4", playback_active=False)
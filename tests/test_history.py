@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+import Klydio
+
+
+@pytest.mark.parametrize("content", ["[]", "null", '{"items": {}}', "{broken"])
+def test_unusable_snapshot_starts_empty(tmp_path, content):
+    path = tmp_path / "home.json"
+    path.write_text(content)
+    assert Klydio.WatchHistory(path=str(path)).items == []
+
+
+def test_malformed_items_are_skipped(tmp_path):
+    good = {"path": "/videos/a.mp4", "title": "a.mp4", "position": 61.0, "duration": 600, "thumbnail": ""}
+    path = tmp_path / "home.json"
+    path.write_text(json.dumps({"items": [good, "a.mp4", {"path": "/videos/b.mp4"}]}))
+    assert Klydio.WatchHistory(path=str(path)).items == [good]
+
+
+def test_record_and_reload(tmp_path):
+    path = str(tmp_path / "home.json")
+    history = Klydio.WatchHistory(path=path)
+    history.record("/videos/a.mp4", 120.0, 600.0, thumbnail=b"jpeg")
+    history.record("/videos/b.mp4", 590.0, 600.0)  # watched to the end
+    history.save()
+    items = Klydio.WatchHistory(path=path).items
+    assert [item["path"] for item in items] == ["/videos/a.mp4"]
+    assert items[0]["position"] == 120.0
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+import Klydio
+from Klydio import merge_ranges
+
+
+@pytest.mark.parametrize("ranges, expected", [
+    ([], []),
+    ([[0, 10]], [[0, 10]]),
+    ([[20, 30], [0, 10]], [[0, 10], [20, 30]]),
+    ([[0, 10], [10, 20]], [[0, 20]]),
+    ([[0, 10], [10.005, 20]], [[0, 20]]),  # float noise at chunk edges
+    ([[0, 10], [10.5, 20]], [[0, 10], [10.5, 20]]),
+    ([[0, 30], [5, 10], [25, 40]], [[0, 40]]),
+])
+def test_merge_ranges(ranges, expected):
+    assert merge_ranges(ranges) == expected
+
+
+@pytest.fixture(scope="module")
+def app():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.mark.parametrize("content", ["[]", "null", '{"done": {}, "cuts": []}', "{broken"])
+def test_unusable_cache_starts_fresh(app, tmp_path, content):
+    video = tmp_path / "movie.mp4"
+    video.write_bytes(b"frames")
+    analyzer = Klydio.SceneAnalyzer(cache_dir=str(tmp_path))
+    with open(analyzer.cache_path(str(video)), "w") as f:
+        f.write(content)
+    analyzer.analyze(str(video), 60.0)
+    assert analyzer.state == {"path": str(video), "done": [], "cuts": [], "duration": 60.0}
+    analyzer.cancel()
+
+
+def test_cached_cuts_are_reported(app, tmp_path):
+    video = tmp_path / "movie.mp4"
+    video.write_bytes(b"frames")
+    analyzer = Klydio.SceneAnalyzer(cache_dir=str(tmp_path))
+    with open(analyzer.cache_path(str(video)), "w") as f:
+        json.dump({"path": str(video), "done": [[0, 60]], "cuts": [12.5, 40.0]}, f)
+    reported = []
+    analyzer.cuts_changed.connect(lambda path, cuts: reported.append(cuts))
+    analyzer.analyze(str(video), 60.0)
+    assert reported == [[12.5, 40.0]]
+    assert analyzer.next_range() is None
+    analyzer.cancel()
@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+import Klydio
+
+
+@pytest.fixture(scope="module")
+def app():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.mark.parametrize("content", ["[]", "42", "null", '"text"', "{not json"])
+def test_unusable_settings_file_falls_back_to_defaults(app, tmp_path, content):
+    path = tmp_path / "settings.json"
+    path.write_text(content)
+    store = Klydio.SettingsStore(path=str(path))
+    assert store.values["profile"] == Klydio.SETTINGS_SCHEMA["profile"][1]
+
+
+def test_invalid_values_are_dropped(app, tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"server.port": 1, "server.max_streams": 3, "unknown": True}))
+    store = Klydio.SettingsStore(path=str(path))
+    assert store.get("server.port") == Klydio.SETTINGS_SCHEMA["server.port"][1]
+    assert store.get("server.max_streams") == 3
@@ -0,0 +1,76 @@
+import http.client
+
+import pytest
+
+import Klydio
+from Klydio import parse_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=5-", (5, 99)),
+    ("bytes=95-200", (95, 99)),  # end past the file is clamped
+    ("bytes=-5", (95, 99)),
+    ("bytes=-500", (0, 99)),
+    ("BYTES = 0-0", (0, 0)),
+])
+def test_parse_range_satisfiable(header, expected):
+    assert parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=100-200", "bytes=-0"])
+def test_parse_range_unsatisfiable(header):
+    assert parse_range(header, 100) == "unsatisfiable"
+
+
+@pytest.mark.parametrize("header", [
+    "bytes=5-2",  # last before first: invalid, so the header is ignored
+    "bytes=-",
+    "bytes=x-",
+    "bytes=+1-2",
+    "bytes=0-1,3-4",
+    "items=0-9",
+    "bytes",
+])
+def test_parse_range_ignored(header):
+    assert parse_range(header, 100) is None
+
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / "a.mp4").write_bytes(bytes(range(256)) * 4)
+    server = Klydio.StreamServer(str(tmp_path), host="127.0.0.1", port=0)
+    server.start()
+    yield server
+    server.stop()
+
+
+def request(server, method, path, headers=None):
+    connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    try:
+        connection.request(method, path, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def test_head_playlist_reports_body_length(server):
+    _, _, body = request(server, "GET", "/playlist.m3u")
+    status, headers, head_body = request(server, "HEAD", "/playlist.m3u")
+    assert status == 200
+    assert head_body == b""
+    assert int(headers["Content-Length"]) == len(body) > 0
+
+
+def test_invalid_range_serves_whole_file(server):
+    status, _, body = request(server, "GET", "/media/a.mp4", {"Range": "bytes=5-2"})
+    assert status == 200
+    assert len(body) == 1024
+
+
+def test_range_request(server):
+    status, headers, body = request(server, "GET", "/media/a.mp4", {"Range": "bytes=10-19"})
+    assert status == 206
+    assert headers["Content-Range"] == "bytes 10-19/1024"
+    assert body == bytes(range(10, 20))
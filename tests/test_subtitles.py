@@ -0,0 +1,156 @@
+import pytest
+
+import Klydio
+from Klydio import SubtitleFileIndex, MappedSubtitleIndex, SubtitleIndex, iter_srt_cues, iter_ass_cues
+
+SRT = """﻿1
+00:00:01,500 --> 00:00:03,000
+<i>Hello</i> there,
+{\\an8}General Kenobi!
+
+2
+00:01:02.25 --> 00:01:04.000
+Second cue
+
+3
+01:00:00,000 --> 01:00:01,000
+Last cue without a trailing blank line"""
+
+ASS = """[Script Info]
+Title: test
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:05.20,0:00:07.00,Default,,0,0,0,,{\\i1}Commas, in text{\\i0}\\Nsecond line
+Dialogue: 0,0:00:09.00,0:00:10.00,Default,,0,0,0,,{\\pos(1,2)}
+Comment: 0,0:00:11.00,0:00:12.00,Default,,0,0,0,,not dialogue
+Dialogue: 0,1:02:03.5,1:02:04.00,Default,,0,0,0,,Later
+"""
+
+
+def test_srt_cues():
+    assert list(iter_srt_cues(SRT.splitlines(True))) == [
+        (1.5, "Hello there, General Kenobi!"),
+        (62.25, "Second cue"),
+        (3600.0, "Last cue without a trailing blank line"),
+    ]
+
+
+def test_ass_cues():
+    assert list(iter_ass_cues(ASS.splitlines(True))) == [
+        (5.2, "Commas, in text second line"),
+        (3723.5, "Later"),
+    ]
+
+
+def build(cues):
+    index = SubtitleFileIndex()
+    for start, text in cues:
+        index.add(start, text)
+    return index
+
+
+CUES = [
+    (1.0, "The quick brown fox"),
+    (2.5, "jumps over the lazy dog"),
+    (4.0, "Quick, quicker, quickest"),
+    (7.0, "Ünïcode wörds and émoji 🎬"),
+    (9.0, "the end"),
+]
+QUERIES = [["the"], ["quick"], ["qu"], ["the", "do"], ["wörds"], ["émoji"], ["missing"], ["quick", "fox"], ["z"]]
+
+
+@pytest.fixture
+def mapped(tmp_path):
+    built = build(CUES)
+    path = tmp_path / "a.idx"
+    path.write_bytes(built.to_bytes())
+    return built, MappedSubtitleIndex(str(path))
+
+
+def test_mapped_index_round_trip(mapped):
+    built, loaded = mapped
+    assert loaded.count == built.count == len(CUES)
+    assert list(loaded.starts) == [start for start, _ in CUES]
+    assert [loaded.text(cue) for cue in range(loaded.count)] == [text for _, text in CUES]
+    for words in QUERIES:
+        assert loaded.search(words) == built.search(words), words
+    assert loaded.search(["the"]) == [0, 1, 4]
+    assert loaded.search(["qu"]) == [0, 2]
+
+
+def test_empty_index_round_trip(tmp_path):
+    path = tmp_path / "empty.idx"
+    path.write_bytes(SubtitleFileIndex().to_bytes())
+    loaded = MappedSubtitleIndex(str(path))
+    assert loaded.count == 0
+    assert loaded.search(["anything"]) == []
+
+
+@pytest.mark.parametrize("damage", [
+    lambda data: data[:-1],
+    lambda data: data[:10],
+    lambda data: b"KLYSUB00" + data[8:],
+    lambda data: data + b"\0",
+])
+def test_damaged_index_is_rejected(tmp_path, damage):
+    path = tmp_path / "bad.idx"
+    path.write_bytes(damage(build(CUES).to_bytes()))
+    with pytest.raises(ValueError):
+        MappedSubtitleIndex(str(path))
+
+
+def write_index(tmp_path, name, cues):
+    path = tmp_path / f"{name}.idx"
+    path.write_bytes(build(cues).to_bytes())
+    return MappedSubtitleIndex(str(path))
+
+
+def test_evicted_files_are_reopened(tmp_path):
+    index = SubtitleIndex(limit=2)
+    for name in ("a", "b", "c"):
+        index.put(f"/videos/{name}.mkv", name, write_index(tmp_path, name, [(1.0, f"hello from {name}")]))
+    assert list(index.files) == ["/videos/b.mkv", "/videos/c.mkv"]
+    assert index.has("/videos/a.mkv", "a")
+    assert not index.has("/videos/a.mkv", "changed")
+
+    assert index.search("hello", path="/videos/a.mkv") == [("/videos/a.mkv", 1.0, "hello from a")]
+    assert list(index.files) == ["/videos/c.mkv", "/videos/a.mkv"]
+
+    hits = index.search("hello")
+    assert sorted(path for path, _, _ in hits) == ["/videos/a.mkv", "/videos/b.mkv", "/videos/c.mkv"]
+    assert len(index.files) == 2
+
+
+def test_files_being_indexed_are_not_kept_once_evicted(tmp_path):
+    index = SubtitleIndex(limit=1)
+    entry = index.begin_file("/videos/a.mkv", "a")
+    index.add_cues(entry, [(1.0, "partial")])
+    index.put("/videos/b.mkv", "b", write_index(tmp_path, "b", [(1.0, "done")]))
+    assert not index.has("/videos/a.mkv", "a")
+    assert index.search("partial", path="/videos/a.mkv") == []
+
+
+def test_missing_cache_file_is_forgotten(tmp_path):
+    index = SubtitleIndex(limit=1)
+    first = write_index(tmp_path, "a", [(1.0, "hello")])
+    index.put("/videos/a.mkv", "a", first)
+    index.put("/videos/b.mkv", "b", write_index(tmp_path, "b", [(1.0, "hello")]))
+    (tmp_path / "a.idx").unlink()
+    assert index.search("hello", path="/videos/a.mkv") == []
+    assert not index.has("/videos/a.mkv", "a")
+
+
+def test_index_file_writes_cache_and_serves_mapped_copy(tmp_path, monkeypatch):
+    video = tmp_path / "movie.mkv"
+    video.write_bytes(b"not really a video")
+    (tmp_path / "movie.srt").write_text(SRT, encoding="utf-8")
+    index = SubtitleIndex()
+    indexer = Klydio.SubtitleIndexer(index, cache_dir=str(tmp_path / "cache"), batch_size=2)
+    monkeypatch.setattr(indexer, "text_streams", lambda path: [])
+    key = Klydio.media_cache_name(str(video))
+    cache_path = str(tmp_path / "cache" / (key + ".idx"))
+
+    assert indexer.index_file(str(video), key, cache_path) == 3
+    assert isinstance(index.files[str(video)], MappedSubtitleIndex)
+    assert index.search("kenobi", path=str(video)) == [(str(video), 1.5, "Hello there, General Kenobi!")]
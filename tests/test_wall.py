@@ -0,0 +1,56 @@
+import pytest
+
+import Klydio
+
+
+@pytest.fixture(scope="module")
+def app():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+class Tile:
+    def __init__(self, visible=True):
+        self.path = "/videos/a.mp4"
+        self.visible = visible
+
+    def is_on_screen(self):
+        return self.visible
+
+
+def scheduler(budget, tiles, focused=0):
+    scheduler = Klydio.DecodeScheduler(budget)
+    scheduler.tiles = tiles
+    scheduler.focused = tiles[focused] if focused is not None else None
+    return scheduler
+
+
+@pytest.mark.parametrize("budget, count, focused_threads", [(4, 9, 1), (1, 16, 1), (16, 9, 8), (8, 4, 5)])
+def test_visible_tiles_never_pause(app, budget, count, focused_threads):
+    tiles = [Tile() for _ in range(count)]
+    plan = scheduler(budget, tiles).plan()
+    assert plan[tiles[0]] == ("focused", focused_threads)
+    assert all(plan[tile] == ("background", 1) for tile in tiles[1:])
+
+
+def test_off_screen_tiles_pause(app):
+    tiles = [Tile(), Tile(visible=False), Tile(), Tile(visible=False)]
+    plan = scheduler(6, tiles).plan()
+    assert plan[tiles[1]] == plan[tiles[3]] == ("hidden", 0)
+    assert plan[tiles[0]] == ("focused", 5)
+    assert plan[tiles[2]] == ("background", 1)
+
+
+def test_hidden_focused_tile_and_empty_tiles(app):
+    empty = Tile()
+    empty.path = None
+    tiles = [Tile(visible=False), Tile(), empty]
+    plan = scheduler(4, tiles).plan()
+    assert plan == {tiles[0]: ("hidden", 0), tiles[1]: ("background", 1)}
+
+
+def test_unscheduled_wall_leaves_threads_to_mpv(app):
+    tiles = [Tile(), Tile(visible=False)]
+    wall = scheduler(2, tiles)
+    wall.enabled = False
+    assert wall.plan() == {tiles[0]: ("focused", 0), tiles[1]: ("focused", 0)}